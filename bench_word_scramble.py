@@ -0,0 +1,292 @@
+"""
+Standalone benchmarks for the logic layer.
+
+Run:
+    python bench_word_scramble.py --words 1000000
+    python bench_word_scramble.py --suite hot --sizes 1000,1000000,10000000 --json bench.json
+    python bench_word_scramble.py --suite hot --baseline bench.json   # exit 1 on regressions
+
+The hot suite times the logic layer's hot paths per call on synthetic lists
+of each size. --json writes every result as {"meta", "results"}; with
+--baseline, results are compared to an earlier file and the run fails when
+a time or peak memory grew by more than the allowed ratio. Times measured
+over less than --min-duration in total are too noisy to compare and are
+skipped.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import string
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from word_scramble_logic import (
+    WordDictionary,
+    WordGameLogic,
+    load_words_from_file,
+    make_scrambled,
+    make_scrambled_batch,
+)
+from word_scramble_wordlist import BloomFilter, compile_word_list
+
+SUITES = ("hot", "formats", "sessions", "scramble")
+
+
+def write_synthetic_words(path: str, count: int, seed: int = 0) -> None:
+    """Write count random words (2-12 letters) to path, one per line."""
+    rng = random.Random(seed)
+    letters = string.ascii_lowercase
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(count):
+            f.write("".join(rng.choices(letters, k=rng.randint(2, 12))))
+            f.write("\n")
+
+
+def measure(fn: Callable[[], object]) -> Dict[str, float]:
+    """Run fn once; return wall time and peak traced Python allocations."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {"seconds": elapsed, "peak_mb": peak / 1e6}
+
+
+def one_off(fn: Callable[[], object], repeat: int = 3) -> Dict[str, float]:
+    """Best wall time of repeat untraced runs of fn, plus the peak memory of a traced run."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+        del result
+    return {"seconds": best, "peak_mb": measure(fn)["peak_mb"]}
+
+
+def per_call(
+    fn: Callable[[], object],
+    calls: int,
+    repeat: int = 3,
+    setup: Optional[Callable[[], object]] = None,
+) -> Dict[str, float]:
+    """
+    Mean wall time of one call of fn, from the best of repeat rounds of
+    calls calls (no tracing overhead). setup runs untimed before each round.
+    """
+    if calls <= 0:
+        raise ValueError(f"per_call needs at least one call, got {calls}")
+    best = float("inf")
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return {"seconds": best / calls, "calls": calls}
+
+
+def bench_hot_paths(count: int, calls: int = 10_000, repeat: int = 3) -> Dict[str, Dict[str, float]]:
+    """
+    The logic layer's hot paths on a list of count words. One-off steps also
+    report peak memory; the rest are timed per call:
+    - init           WordGameLogic with a cold load of the word list
+    - session_init   WordGameLogic over an already loaded dictionary
+    - next_word      drawing within a run (includes the sparse-to-dense switch)
+    - next_word_refill  start_run() then next_word(): a fresh pool each time
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        text = os.path.join(tmp, "words.txt")
+        write_synthetic_words(text, count)
+        results = {
+            "load_words_from_file": one_off(lambda: load_words_from_file(text), repeat),
+            # WordDictionary directly, so load_dictionary's cache does not hide the load
+            "init": one_off(lambda: WordGameLogic(dictionary=WordDictionary(text)), repeat),
+        }
+        dictionary = WordDictionary(text)
+
+    rng = random.Random(0)
+    logic = WordGameLogic(dictionary=dictionary, rng=rng)
+    results["start_run"] = one_off(logic.start_run, repeat)
+    results["session_init"] = per_call(lambda: WordGameLogic(dictionary=dictionary), calls, repeat)
+
+    draws = min(calls, logic.index.count("Medium"))
+    if draws:  # tiny lists can have no Medium words
+        results["next_word"] = per_call(lambda: logic.next_word("Medium"), draws, repeat, setup=logic.start_run)
+
+    def refill():
+        logic.start_run()
+        logic.next_word("Medium")
+
+    results["next_word_refill"] = per_call(refill, calls, repeat)
+    words = itertools.cycle([dictionary.words[i] for i in dictionary.index.ids[:calls]])
+    results["make_scrambled"] = per_call(lambda: make_scrambled(next(words), rng), calls, repeat)
+    results["remaining_counts"] = per_call(logic.remaining_counts, calls, repeat)
+    return results
+
+
+def compare_results(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    max_slowdown: float = 1.5,
+    max_memory_growth: float = 1.25,
+    min_duration: float = 1e-3,
+    path: str = "",
+) -> List[str]:
+    """
+    Regressions of results against baseline (same nesting as the JSON
+    results): a description of every "seconds" that grew by more than
+    max_slowdown and every "peak_mb" that grew by more than
+    max_memory_growth. A time is only compared when the baseline measured
+    at least min_duration seconds in total (seconds x calls for per-call
+    results): shorter runs are dominated by timer and scheduler noise.
+    Entries missing from either side are skipped.
+    """
+    regressions = []
+    for key, value in results.items():
+        base = baseline.get(key)
+        where = f"{path}/{key}" if path else key
+        if isinstance(value, dict) and isinstance(base, dict):
+            regressions += compare_results(value, base, max_slowdown, max_memory_growth, min_duration, where)
+        elif key == "seconds" and isinstance(base, (int, float)) and value > base * max_slowdown:
+            if base * baseline.get("calls", 1) >= min_duration:
+                regressions.append(f"{where}: {base:.3g}s -> {value:.3g}s")
+        elif key == "peak_mb" and isinstance(base, (int, float)) and value > max(base, 0.01) * max_memory_growth:
+            regressions.append(f"{where}: {base:.3g} MB -> {value:.3g} MB")
+    return regressions
+
+
+def bench_formats(count: int) -> Dict[str, Dict[str, float]]:
+    """Compare WordGameLogic startup for text, memory-mapped and compiled lists."""
+    with tempfile.TemporaryDirectory() as tmp:
+        text = os.path.join(tmp, "words.txt")
+        compiled = os.path.join(tmp, "words.wsc")
+        write_synthetic_words(text, count)
+        with open(text, "r", encoding="utf-8") as f:
+            compile_word_list(f, compiled)
+
+        return {
+            "text": measure(lambda: WordGameLogic(text)),
+            "text_mmap": measure(lambda: WordGameLogic(text, use_mmap=True)),
+            "compiled": measure(lambda: WordGameLogic(compiled)),
+            "compiled_mmap": measure(lambda: WordGameLogic(compiled, use_mmap=True)),
+        }
+
+
+def bench_sessions(count: int, sessions: int) -> Dict[str, float]:
+    """Memory for many concurrent sessions sharing one dictionary."""
+    with tempfile.TemporaryDirectory() as tmp:
+        text = os.path.join(tmp, "words.txt")
+        write_synthetic_words(text, count)
+        dictionary = WordGameLogic(text).dictionary
+
+        def create():
+            players = [WordGameLogic(dictionary=dictionary) for _ in range(sessions)]
+            for p in players:
+                p.start_run()
+            return players
+
+        return measure(create)
+
+
+def bench_scramble(count: int) -> Dict[str, Dict[str, float]]:
+    """
+    Per-word make_scrambled loop versus make_scrambled_batch, and the cost of
+    rejecting scrambles that are dictionary words (exact and Bloom filter).
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        text = os.path.join(tmp, "words.txt")
+        write_synthetic_words(text, count)
+        dictionary = WordGameLogic(text).dictionary
+    words = list(dictionary.words)
+    bloom = BloomFilter(len(words))
+    for w in words:
+        bloom.add(w)
+
+    return {
+        "make_scrambled": measure(lambda: [make_scrambled(w) for w in words]),
+        "make_scrambled_batch": measure(lambda: make_scrambled_batch(words)),
+        "reject_exact": measure(lambda: [make_scrambled(w, reject=dictionary) for w in words]),
+        "reject_bloom": measure(lambda: [make_scrambled(w, reject=bloom) for w in words]),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Word scramble benchmarks")
+    parser.add_argument("--suite", action="append", choices=SUITES, help="suites to run (default: all)")
+    parser.add_argument("--words", type=int, default=1_000_000, help="synthetic word count")
+    parser.add_argument("--sessions", type=int, default=100_000, help="concurrent sessions")
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="word counts for the hot suite")
+    parser.add_argument("--repeat", type=int, default=3, help="hot suite: best of this many rounds")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="compare with results from an earlier --json run")
+    parser.add_argument("--max-slowdown", type=float, default=1.5, help="allowed time ratio over the baseline")
+    parser.add_argument("--max-memory-growth", type=float, default=1.25, help="allowed peak memory ratio")
+    parser.add_argument(
+        "--min-duration", type=float, default=1e-3, help="only compare times measured over at least this many seconds"
+    )
+    args = parser.parse_args(argv)
+    suites = args.suite or SUITES
+    results: Dict[str, Any] = {}
+
+    if "hot" in suites:
+        results["hot"] = {}
+        for size in (int(s) for s in args.sizes.split(",")):
+            print(f"Hot paths, {size} words")
+            hot = results["hot"][str(size)] = bench_hot_paths(size, repeat=args.repeat)
+            for name, result in hot.items():
+                memory = f"  {result['peak_mb']:10.1f} MB peak" if "peak_mb" in result else ""
+                print(f"  {name:<22} {result['seconds'] * 1e6:14.1f} us{memory}")
+
+    if "formats" in suites:
+        print(f"WordGameLogic startup, {args.words} words")
+        results["formats"] = bench_formats(args.words)
+        for name, result in results["formats"].items():
+            print(f"  {name:<14} {result['seconds'] * 1000:10.1f} ms  {result['peak_mb']:10.1f} MB peak")
+
+    if "sessions" in suites:
+        result = results["sessions"] = bench_sessions(args.words, args.sessions)
+        print(f"{args.sessions} sessions: {result['peak_mb']:.1f} MB peak "
+              f"({result['peak_mb'] * 1e6 / args.sessions:.0f} bytes/session)")
+
+    if "scramble" in suites:
+        print(f"Scrambling {args.words} words")
+        results["scramble"] = bench_scramble(args.words)
+        for name, result in results["scramble"].items():
+            print(f"  {name:<22} {args.words / result['seconds']:12.0f} words/s")
+
+    if args.json:
+        meta = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "words": args.words,
+            "sessions": args.sessions,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare_results(
+            results, baseline, args.max_slowdown, args.max_memory_growth, args.min_duration
+        )
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print("No regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
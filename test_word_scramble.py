@@ -1,5 +1,37 @@
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+
 import pytest
-from word_scramble_logic import WordGameLogic, make_scrambled
+from bench_word_scramble import compare_results, per_call
+from word_scramble_adaptive import FenwickTree, WeightedDraw, WordStats
+from word_scramble_categories import CategoryRegistry
+from word_scramble_difficulty import FeatureModel, LengthModel
+from word_scramble_leaderboard import Leaderboard, RankedSkipList
+from word_scramble_logic import (
+    CounterRNG,
+    RoundHints,
+    RoundTimer,
+    WordDraw,
+    WordGameLogic,
+    load_dictionary,
+    load_words_from_file,
+    make_rng,
+    make_scrambled,
+    make_scrambled_batch,
+    scramble_word,
+)
+from word_scramble_cache import ScrambleCache
+from word_scramble_metrics import Metrics
+from word_scramble_packs import generate_puzzles, read_pack, write_binary, write_jsonl
+from word_scramble_reload import DictionaryWatcher
+from word_scramble_scores import ScoreStore
+from word_scramble_server import GameServer, GameSessions, main as server_main
+from word_scramble_shard import ShardRouter
+from word_scramble_wordlist import BloomFilter, CompiledWordList, compile_word_list
 
 # We override the words file with a small controlled list.
 TEST_WORDS = ["MILK", "KIWI", "BANANA", "ORANGE", "STRAWBERRY"]
@@ -30,6 +62,71 @@ def test_filter_words_by_difficulty(logic):
     assert set(logic.filter_words_by_difficulty("Hard")) == {"STRAWBERRY"}
 
 
+def test_word_index_groups_by_length(logic):
+    index = logic.index
+    # ids are ordered by length, so each difficulty is one contiguous slice
+    lengths = [len(logic.words_all[i]) for i in index.ids]
+    assert lengths == sorted(lengths)
+    assert index.count("Easy") == 2
+    assert index.count("Medium") == 2
+    assert index.count("Hard") == 1
+
+
+def test_mmap_loader_matches_text_loader(tmp_path):
+    word_file = tmp_path / "word_list.txt"
+    word_file.write_text("  milk\r\n\nkiwi  \nBanana\n")
+
+    mapped = load_words_from_file(str(word_file), use_mmap=True)
+    assert list(mapped) == load_words_from_file(str(word_file))
+    assert mapped[1] == "KIWI"
+    assert list(mapped.lengths()) == [4, 4, 6]
+
+    wl = WordGameLogic(word_file=str(word_file), use_mmap=True)
+    assert wl.remaining_counts() == {"Easy": 2, "Medium": 1, "Hard": 0}
+
+
+def test_mmap_scan_without_numpy_matches(tmp_path, monkeypatch):
+    import word_scramble_logic
+    import word_scramble_wordlist
+
+    word_file = tmp_path / "word_list.txt"
+    word_file.write_text("\n \t\nmilk\r\n  pear tree \nKIWI\nbanana \r\n\n", encoding="utf-8")
+    fast = load_words_from_file(str(word_file), use_mmap=True)
+    fast_index = load_dictionary(str(word_file), use_mmap=True).index
+    monkeypatch.setattr(word_scramble_wordlist, "np", None)
+    monkeypatch.setattr(word_scramble_logic, "np", None)
+    slow = load_words_from_file(str(word_file), use_mmap=True)
+
+    assert list(fast) == list(slow) == load_words_from_file(str(word_file))
+    assert list(fast.starts) == list(slow.starts) and list(fast.ends) == list(slow.ends)
+    assert list(fast.lengths()) == list(slow.lengths()) == [4, 9, 4, 6]
+    assert list(fast_index.ids) == list(word_scramble_logic.WordIndex(slow).ids)
+
+
+def test_compiled_word_list_round_trip(tmp_path):
+    compiled = tmp_path / "word_list.wsc"
+    assert compile_word_list(TEST_WORDS + ["milk"], str(compiled)) == len(TEST_WORDS)
+
+    words = load_words_from_file(str(compiled))
+    assert isinstance(words, CompiledWordList)
+    assert sorted(words) == sorted(TEST_WORDS)
+
+    wl = WordGameLogic(word_file=str(compiled))
+    assert set(wl.filter_words_by_difficulty("Medium")) == {"BANANA", "ORANGE"}
+    assert wl.remaining_counts() == {"Easy": 2, "Medium": 2, "Hard": 1}
+
+
+def test_compiled_word_list_detects_corruption(tmp_path):
+    compiled = tmp_path / "word_list.wsc"
+    compile_word_list(TEST_WORDS, str(compiled))
+    data = bytearray(compiled.read_bytes())
+    data[-1] ^= 0xFF
+    compiled.write_bytes(bytes(data))
+
+    with pytest.raises(ValueError):
+        WordGameLogic(word_file=str(compiled))
+
+
 def test_start_run_initializes_pools(logic):
     rem = logic.remaining_counts()
     assert rem["Easy"] == 2
@@ -52,6 +149,85 @@ def test_next_word_no_repeats(logic):
         logic.next_word("Easy")
 
 
+def test_next_word_draws_each_word_once(tmp_path):
+    word_file = tmp_path / "word_list.txt"
+    word_file.write_text("\n".join(TEST_WORDS + ["MILK", "KIWI"]))
+    wl = WordGameLogic(word_file=str(word_file))
+    wl.start_run()
+
+    drawn = [wl.next_word("Easy")[0] for _ in range(2)]
+    assert sorted(drawn) == ["KIWI", "MILK"]
+    assert wl.used_words == {"KIWI", "MILK"}
+    assert wl.remaining_counts()["Easy"] == 0
+
+
+@pytest.mark.parametrize("size", [1, 5, 100])
+def test_word_draw_is_a_permutation(size):
+    draw = WordDraw(size)
+    rng = CounterRNG(3)
+    picked = [draw.draw(rng) for _ in range(size)]
+
+    assert sorted(picked) == list(range(size))
+    assert sorted(draw.drawn()) == list(range(size))
+    with pytest.raises(IndexError):
+        draw.draw(rng)
+
+
+def test_sessions_share_dictionary(logic):
+    other = WordGameLogic(word_file=logic.word_file)
+    assert other.dictionary is logic.dictionary
+    assert not hasattr(other, "__dict__")
+
+    # draw state is per session
+    logic.next_word("Hard")
+    assert logic.remaining_counts()["Hard"] == 0
+    assert other.remaining_counts()["Hard"] == 1
+
+
+def test_new_sessions_see_an_edited_word_file(tmp_path):
+    word_file = tmp_path / "words.txt"
+    word_file.write_text("KIWI\nMILK\n", encoding="utf-8")
+    first = WordGameLogic(str(word_file))
+    word_file.write_text("KIWI\nMILK\nPEAR\nPLUM\nFIG\n", encoding="utf-8")
+    second = WordGameLogic(str(word_file))
+    assert len(first.words_all) == 2 and len(second.words_all) == 5
+    assert WordGameLogic(str(word_file)).dictionary is second.dictionary
+
+
+def test_anagram_guesses_are_accepted(tmp_path):
+    word_file = tmp_path / "word_list.txt"
+    word_file.write_text("\n".join(["LEMON", "MELON", "PEACH", "CHEAP", "KIWI"]))
+    wl = WordGameLogic(word_file=str(word_file))
+
+    assert sorted(wl.dictionary.anagrams("MELON")) == ["LEMON", "MELON"]
+    assert "PEACH" in wl.dictionary and "NOMEL" not in wl.dictionary
+    assert wl.is_correct_guess("melon", "LEMON")
+    assert wl.is_correct_guess("LEMON", "LEMON")
+    assert not wl.is_correct_guess("NOMEL", "LEMON")
+    assert not wl.is_correct_guess("CHEAP", "LEMON")
+
+
+def test_duplicate_lines_are_one_anagram(tmp_path):
+    word_file = tmp_path / "word_list.txt"
+    word_file.write_text("\n".join(["LEMON", "MELON", "LEMON", "PEACH", "PEACH"]))
+    mapped = load_dictionary(str(word_file), use_mmap=True)
+
+    assert len(mapped.anagram_ids("LEMON")) == 2
+    assert sorted(mapped.anagrams("MELON")) == ["LEMON", "MELON"]
+    assert len(mapped.anagram_ids("PEACH")) == 1
+
+
+def test_next_word_can_avoid_or_prefer_anagrams(tmp_path):
+    word_file = tmp_path / "word_list.txt"
+    word_file.write_text("\n".join(["LEMON", "MELON", "PEACH", "GRAPE", "APPLE", "MANGO"]))
+    wl = WordGameLogic(word_file=str(word_file), seed=3)
+
+    assert wl.next_word("Easy", anagrams="prefer")[0] in {"LEMON", "MELON"}
+    assert wl.next_word("Easy", anagrams="avoid")[0] not in {"LEMON", "MELON"}
+    with pytest.raises(ValueError):
+        wl.next_word("Easy", anagrams="sometimes")
+
+
 def test_scrambled_word_is_scrambled(logic):
     original = "BANANA"
     scrambled, order = make_scrambled(original)
@@ -63,6 +239,110 @@ def test_scrambled_word_is_scrambled(logic):
     assert scrambled != original
 
 
+def test_make_scrambled_batch(logic):
+    words = TEST_WORDS + ["A", "", "AAA"]
+    results = make_scrambled_batch(words)
+
+    assert len(results) == len(words)
+    for word, (scrambled, order) in zip(words, results):
+        assert scrambled == scramble_word(word, order)
+        assert sorted(order) == list(range(len(word)))
+        if len(set(word)) > 1:
+            assert scrambled != word
+    assert results[5] == ("A", [0])
+    assert results[6] == ("", [])
+
+
+@pytest.mark.parametrize("rng_kind", ["mt", "counter"])
+def test_seeded_sessions_are_reproducible(logic, rng_kind):
+    def play(seed):
+        wl = WordGameLogic(word_file=logic.word_file, seed=seed, rng_kind=rng_kind)
+        wl.start_run()
+        return [wl.next_word(d) for d in ("Easy", "Medium", "Easy", "Medium")]
+
+    assert play(7) == play(7)
+
+    # reseeding replays the run on the same session
+    wl = WordGameLogic(word_file=logic.word_file, rng_kind=rng_kind)
+    wl.start_run(seed=7)
+    assert type(wl.rng) is type(make_rng(0, rng_kind))
+    first = wl.next_word("Medium")
+    wl.start_run(seed=7)
+    assert wl.next_word("Medium") == first
+
+
+def test_counter_rng_replays_from_state():
+    rng = CounterRNG(42)
+    state = rng.getstate()
+    values = [rng.randrange(10) for _ in range(50)]
+    assert all(0 <= v < 10 for v in values)
+
+    rng.setstate(state)
+    assert [rng.randrange(10) for _ in range(50)] == values
+    assert make_scrambled("BANANA", CounterRNG(1)) == make_scrambled("BANANA", CounterRNG(1))
+
+
+def test_scramble_cache_hits_and_evicts():
+    cache = ScrambleCache(per_word=4, max_words=2, seed=1, background=False)
+
+    scrambled, order = cache.get("BANANA")  # miss, fills the pool
+    assert scramble_word("BANANA", order) == scrambled != "BANANA"
+    scrambled, order = cache.get("BANANA")  # hit
+    assert scramble_word("BANANA", order) == scrambled != "BANANA"
+
+    cache.get("ORANGE")
+    cache.get("LEMON")  # evicts BANANA, the least recently used
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 3, 1)
+    assert stats["words"] == 2
+
+
+def test_next_word_uses_scrambler(logic):
+    cache = ScrambleCache(seed=1, background=False)
+    cache.prefetch(TEST_WORDS)
+    wl = WordGameLogic(word_file=logic.word_file, scrambler=cache)
+
+    chosen, scrambled, order = wl.next_word("Medium")
+    assert scramble_word(chosen, order) == scrambled
+    assert cache.stats()["hits"] == 1
+
+
+def test_scrambles_avoid_dictionary_words(tmp_path):
+    word_file = tmp_path / "word_list.txt"
+    word_file.write_text("\n".join(["NO", "ON"]))
+    wl = WordGameLogic(word_file=str(word_file), avoid_real_words=True)
+
+    # "NO" can only scramble to "ON", so make_scrambled settles for it, but
+    # never for the word itself; with a free scramble no dictionary word is chosen
+    assert make_scrambled("ABC", CounterRNG(0), reject={"ACB", "BAC", "BCA", "CAB"})[0] == "CBA"
+    word, scrambled, _ = wl.next_word("Easy")
+    assert scrambled != word
+    rng = random.Random(0)
+    assert all(make_scrambled("NO", rng, reject={"NO", "ON"})[0] == "ON" for _ in range(200))
+
+
+def test_bloom_filter_has_no_false_negatives():
+    words = [f"WORD{i}" for i in range(2000)]
+    bloom = BloomFilter(len(words), error_rate=0.01)
+    for w in words:
+        bloom.add(w)
+
+    assert all(w in bloom for w in words)
+    false_hits = sum(f"OTHER{i}" in bloom for i in range(2000))
+    assert false_hits < 100
+
+
+def test_compiled_dictionary_uses_bloom_scramble_filter(tmp_path):
+    compiled = tmp_path / "word_list.wsc"
+    compile_word_list(TEST_WORDS, str(compiled))
+    wl = WordGameLogic(word_file=str(compiled), avoid_real_words=True)
+
+    assert isinstance(wl.dictionary.scramble_filter, BloomFilter)
+    assert "BANANA" in wl.dictionary.scramble_filter
+    chosen, scrambled, _ = wl.next_word("Medium")
+    assert scrambled not in TEST_WORDS
+
+
 def test_record_win(logic):
     logic.record_win(attempts=5, time_used_seconds=30)
 
@@ -83,6 +363,674 @@ def test_record_win(logic):
     assert logic.best_time == 20
 
 
+def test_round_timer_counts_from_deadline():
+    now = [100.0]
+    timer = RoundTimer(30, clock=lambda: now[0])
+    assert timer.display_seconds() == 30
+
+    now[0] += 0.25
+    assert timer.display_seconds() == 30
+    assert timer.ms_until_display_change() == 750
+
+    # a stalled UI skips straight to the correct value
+    now[0] += 12.5
+    assert timer.display_seconds() == 18
+    assert timer.elapsed() == pytest.approx(12.75)
+
+    now[0] += 20
+    assert timer.expired()
+    assert timer.display_seconds() == 0
+
+
+def test_guess_at_the_deadline_ends_the_round_as_a_timeout(logic):
+    # the GUI asks the timer before judging a guess, since its countdown
+    # callback can fire late; a right answer at the deadline is still a loss
+    now = [100.0]
+    stats = WordStats(len(logic.words_all))
+    session = WordGameLogic(logic.word_file, seed=1, word_stats=stats)
+    word, _, _ = session.next_word("Easy")
+    timer = RoundTimer(75, clock=lambda: now[0])
+    now[0] += 74.5
+    assert not timer.expired()
+    now[0] += 0.5
+    assert timer.expired() and session.is_correct_guess(word, word)
+
+    session.record_loss("timeout")
+    word_id = logic.dictionary.word_id(word)
+    assert (session.total_rounds, session.rounds_won, session.best_time) == (1, 0, None)
+    assert (stats.plays[word_id], stats.wins[word_id]) == (1, 0)
+
+
+def test_server_plays_a_round_over_tcp(logic):
+    async def play():
+        server = GameServer(GameSessions(logic.word_file))
+        srv = await server.start("127.0.0.1", 0)
+        port = srv.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+        async def call(**request):
+            writer.write(json.dumps(request).encode() + b"\n")
+            await writer.drain()
+            return json.loads(await reader.readline())
+
+        try:
+            session = (await call(cmd="start", seed=1))["session"]
+            round_ = await call(cmd="next", session=session, difficulty="Hard")
+            assert round_["scrambled"] != "STRAWBERRY"
+            assert round_["seconds"] == 30
+
+            assert (await call(cmd="guess", session=session, guess="kiwi"))["result"] == "wrong"
+            won = await call(cmd="guess", session=session, guess="strawberry")
+            assert (won["result"], won["attempts"]) == ("correct", 2)
+
+            board = await call(cmd="scoreboard", session=session)
+            assert (board["total_rounds"], board["rounds_won"]) == (1, 1)
+            assert (await call(cmd="guess", session=session, guess="x"))["ok"] is False
+            assert (await call(cmd="bogus"))["error"] == "unknown command: 'bogus'"
+        finally:
+            writer.close()
+            await server.close()
+
+    asyncio.run(play())
+
+
+def test_server_round_times_out(logic):
+    sessions = GameSessions(logic.word_file)
+    session = sessions.handle({"cmd": "start"})["session"]
+    sessions.handle({"cmd": "next", "session": session, "difficulty": "Easy"})
+    sessions.sessions[session].timer.deadline = 0  # force expiry
+
+    reply = sessions.handle({"cmd": "guess", "session": session, "guess": "MILK"})
+    assert reply["result"] == "timeout"
+    assert reply["word"] in {"MILK", "KIWI"}
+
+
+def test_round_hints_reveal_letters_in_order():
+    word = "BANANA"
+    scrambled, order = make_scrambled(word, random.Random(3))
+    hints = RoundHints(word, order)
+    for pos in range(len(word)):
+        position, letter, tile = hints.next_hint()
+        assert (position, letter) == (pos, word[pos])
+        assert scrambled[tile] == letter
+    assert hints.next_hint() is None
+    assert hints.pattern() == word and hints.revealed() == len(word)
+
+    hints = RoundHints(word, order)
+    hints.next_hint()
+    assert hints.pattern() == "B_____"
+
+
+def test_server_hint_command(logic):
+    sessions = GameSessions(logic.word_file)
+    session = sessions.handle({"cmd": "start"})["session"]
+    assert sessions.handle({"cmd": "hint", "session": session})["ok"] is False
+    sessions.handle({"cmd": "next", "session": session, "difficulty": "Easy"})
+    word = sessions.sessions[session].word
+    reply = sessions.handle({"cmd": "hint", "session": session})
+    assert reply["ok"] and reply["letter"] == word[0] and reply["pattern"] == word[0] + "___"
+
+
+def test_server_rejects_malformed_requests(logic):
+    sessions = GameSessions(logic.word_file)
+    session = sessions.handle({"cmd": "start", "session": "s1"})["session"]
+    for request in (
+        {"cmd": []},
+        {"cmd": "next", "session": [1]},
+        {"cmd": "start", "seed": [1]},
+        {"cmd": "start", "seed": True},
+        {"cmd": "leaderboard", "n": "5"},
+        {"cmd": "guess", "session": session, "guess": 3},
+        {"cmd": "start", "session": "s1"},  # already taken
+    ):
+        reply = sessions.handle(request)
+        assert reply["ok"] is False and reply["error"]
+    assert sessions.handle({"cmd": "leaderboard", "n": None})["ok"]
+
+
+def test_server_ends_timed_out_rounds_everywhere(logic):
+    sessions = GameSessions(logic.word_file, adaptive=True)
+    session = sessions.handle({"cmd": "start", "seed": 1})["session"]
+    state = sessions.sessions[session]
+    for cmd, difficulty in (("hint", "Easy"), ("solve", "Easy"), ("guess", "Medium")):
+        sessions.handle({"cmd": "next", "session": session, "difficulty": difficulty})
+        word, state.timer = state.word, RoundTimer(-1)
+        reply = sessions.handle({"cmd": cmd, "session": session, "guess": word})
+        assert reply == {"result": "timeout", "word": word, "ok": True}
+    sessions.handle({"cmd": "next", "session": session, "difficulty": "Medium"})
+    sessions.handle({"cmd": "next", "session": session, "difficulty": "Hard"})  # skips the last one
+    assert state.logic.total_rounds == 5 and state.logic.rounds_won == 0
+    assert sessions.word_stats.plays.tolist().count(1) == 4
+
+
+def test_shard_router_pins_sessions_to_workers(logic):
+    router = ShardRouter(logic.word_file, workers=2)
+    try:
+        sessions = [router.call({"cmd": "start", "seed": i})["session"] for i in range(6)]
+        for session in sessions:
+            reply = router.call({"cmd": "next", "session": session, "difficulty": "Easy"})
+            assert reply["ok"] and reply["remaining"]["Easy"] == 1
+            reply = router.call({"cmd": "scoreboard", "session": session})
+            assert reply["total_rounds"] == 1
+        assert router.call({"cmd": "next", "session": "missing"})["ok"] is False
+        # session-less commands are answered by the router
+        assert router.call({"cmd": "categories"}) == {"categories": [], "ok": True}
+        assert router.call({"cmd": "metrics"}) == {"ok": False, "error": "metrics are not enabled"}
+    finally:
+        router.close()
+
+
+@pytest.mark.parametrize("flag", [["--scores", "scores"], ["--watch", "2"], ["--categories", "lists"], ["--metrics"]])
+def test_server_refuses_single_process_flags_with_workers(flag, capsys):
+    with pytest.raises(SystemExit):
+        server_main(["--workers", "2", *flag])
+    assert "single-process mode" in capsys.readouterr().err
+
+
+def test_sharded_leaderboard_ranks_players_of_every_worker(logic):
+    router = ShardRouter(logic.word_file, workers=2)
+    try:
+        # one session on each worker
+        ids = {router.worker_for(f"s{i}"): f"s{i}" for i in range(20)}
+        assert len(ids) == 2
+        for player, session in zip(("ana", "bob"), ids.values()):
+            router.call({"cmd": "start", "session": session, "player": player, "seed": 1})
+            router.call({"cmd": "next", "session": session, "difficulty": "Easy"})
+            for guess in ("MILK", "KIWI"):
+                router.call({"cmd": "guess", "session": session, "guess": guess})
+        top = router.call({"cmd": "leaderboard", "difficulty": "Easy", "metric": "attempts"})["top"]
+        assert sorted(player for _, player in top) == ["ana", "bob"]
+        ranks = [
+            router.call({"cmd": "leaderboard", "session": s, "difficulty": "Easy"})["rank"] for s in ids.values()
+        ]
+        assert sorted(ranks) == [1, 2]
+        assert router.call({"cmd": "leaderboard", "session": "missing"})["ok"] is False
+        assert router.call({"cmd": "leaderboard", "n": "x"})["ok"] is False
+    finally:
+        router.close()
+
+
+def test_score_store_persists_across_restarts(logic, tmp_path):
+    store = ScoreStore(str(tmp_path / "scores"), batch_size=2)
+    wl = WordGameLogic(word_file=logic.word_file, player="ana", score_store=store)
+    wl.next_word("Easy")
+    wl.record_win(attempts=3, time_used_seconds=4.5)
+    wl.next_word("Easy")
+    store.close()
+
+    store = ScoreStore(str(tmp_path / "scores"))
+    wl = WordGameLogic(word_file=logic.word_file, player="ana", score_store=store)
+    assert (wl.total_rounds, wl.rounds_won, wl.best_attempts, wl.best_time) == (2, 1, 3, 4.5)
+
+    # compaction folds the log into the snapshot without changing totals
+    wl.next_word("Medium")
+    store.compact()
+    store.close()
+    assert os.path.getsize(store.log_path) == 0
+
+    store = ScoreStore(str(tmp_path / "scores"))
+    assert store.stats("ana").total_rounds == 3
+    assert store.stats("bob") is None
+    store.close()
+
+
+def test_score_store_recovers_from_torn_write(tmp_path):
+    store = ScoreStore(str(tmp_path / "scores"))
+    for _ in range(3):
+        store.record_round("ana")
+    store.close()
+    with open(store.log_path, "a", encoding="utf-8") as f:
+        f.write('[4,"r","an')  # crash mid-write
+
+    store = ScoreStore(str(tmp_path / "scores"))
+    assert store.stats("ana").total_rounds == 3
+    for _ in range(5):
+        store.record_round("ana")
+    store.close()
+    store = ScoreStore(str(tmp_path / "scores"))
+    assert store.stats("ana").total_rounds == 8
+    store.close()
+
+
+def test_leaderboard_ranks_best_scores():
+    board = Leaderboard()
+    board.record_win("ana", "Easy", attempts=4, time_used_seconds=12.0)
+    board.record_win("bob", "Easy", attempts=2, time_used_seconds=20.0)
+    board.record_win("cy", "Easy", attempts=3, time_used_seconds=8.0)
+    board.record_win("ana", "Easy", attempts=9, time_used_seconds=5.0)  # only time improves
+
+    assert board.top("Easy", "time") == [(5.0, "ana"), (8.0, "cy"), (20.0, "bob")]
+    assert board.top("Easy", "attempts", n=2) == [(2, "bob"), (3, "cy")]
+    assert board.rank_of("bob", "Easy", "time") == 3
+    assert board.rank_of("ana", "Easy", "attempts") == 3
+    assert board.rank_of("dee", "Easy") is None
+    assert board.top("Hard") == []
+
+
+def test_ranked_skiplist_matches_sorted_list():
+    rng = random.Random(0)
+    ranked, expected = RankedSkipList(seed=1), []
+    for step in range(500):
+        if expected and rng.random() < 0.3:
+            key = expected.pop(rng.randrange(len(expected)))
+            ranked.remove(key)
+        else:
+            key = (rng.randint(0, 20), str(step))
+            expected.append(key)
+            ranked.insert(key)
+        expected.sort()
+    assert ranked.first(len(expected)) == expected
+    assert [ranked.rank(k) for k in expected] == list(range(len(expected)))
+
+
+def test_leaderboard_loads_from_score_store(logic, tmp_path):
+    store = ScoreStore(str(tmp_path / "scores"))
+    wl = WordGameLogic(word_file=logic.word_file, player="ana", score_store=store)
+    wl.next_word("Hard")
+    wl.record_win(attempts=1, time_used_seconds=3.0)
+    store.close()
+
+    store = ScoreStore(str(tmp_path / "scores"))
+    board = Leaderboard()
+    board.load(store)
+    store.close()
+    assert board.top("Hard") == [(3.0, "ana")]
+
+    sessions = GameSessions(logic.word_file, leaderboard=board)
+    session = sessions.handle({"cmd": "start", "player": "ana"})["session"]
+    reply = sessions.handle({"cmd": "leaderboard", "session": session, "difficulty": "Hard"})
+    assert reply["top"] == [(3.0, "ana")]
+    assert reply["rank"] == 1
+
+
+def test_length_model_matches_default_buckets(logic):
+    scored = WordGameLogic(logic.word_file, difficulty_model=LengthModel())
+    for d in WordGameLogic.DIFFICULTIES:
+        assert sorted(scored.filter_words_by_difficulty(d)) == sorted(logic.filter_words_by_difficulty(d))
+
+
+def test_feature_model_scores_and_buckets(tmp_path):
+    word_file = tmp_path / "words.txt"
+    word_file.write_text("LEMON\nMELON\nJAZZ\nQUIZ\nTEA\n", encoding="utf-8")
+    model = FeatureModel(solve_rates={"TEA": 1.0})
+    scores = dict(zip(["LEMON", "MELON", "JAZZ", "QUIZ", "TEA"], model.score_words(
+        ["LEMON", "MELON", "JAZZ", "QUIZ", "TEA"])))
+    assert scores["LEMON"] == scores["MELON"] < 5  # anagrams of each other
+    assert scores["QUIZ"] > 4 > scores["JAZZ"]  # both rare, but JAZZ repeats a letter
+    assert scores["TEA"] < 3 - 1  # always solved
+
+    logic = WordGameLogic(str(word_file), difficulty_model=model)
+    start, stop = logic.index.span("Easy")
+    easy_scores = list(logic.index.scores[start:stop])
+    assert easy_scores == sorted(easy_scores)
+    assert sum(logic.remaining_counts().values()) + 1 == 5  # TEA scores below Easy
+
+
+def test_compiled_list_stores_difficulty_scores(logic, tmp_path):
+    compiled = str(tmp_path / "words.wsc")
+    model = FeatureModel()
+    compile_word_list(TEST_WORDS, compiled, model)
+    words = CompiledWordList(compiled)
+    assert words.score_model == "features"
+    assert list(words.scores) == sorted(words.scores)
+
+    stored = WordGameLogic(compiled)
+    fresh = WordGameLogic(compiled, difficulty_model=LengthModel())
+    assert stored.index.model_name == "features" and fresh.index.model_name == "length"
+    scored_text = WordGameLogic(logic.word_file, difficulty_model=model)
+    for d in WordGameLogic.DIFFICULTIES:
+        assert stored.filter_words_by_difficulty(d) == scored_text.filter_words_by_difficulty(d)
+        assert sorted(fresh.filter_words_by_difficulty(d)) == sorted(logic.filter_words_by_difficulty(d))
+
+    # custom settings are scored again rather than read from the file
+    custom = FeatureModel(solve_rates={"MILK": 0.0}, solve_weight=20.0)
+    assert "MILK" in WordGameLogic(logic.word_file, difficulty_model=custom).filter_words_by_difficulty("Hard")
+    rescored = WordGameLogic(compiled, difficulty_model=custom)
+    assert "MILK" in rescored.filter_words_by_difficulty("Hard")
+    with pytest.raises(ValueError):
+        compile_word_list(TEST_WORDS, str(tmp_path / "custom.wsc"), custom)
+
+
+def test_fenwick_tree_samples_by_weight():
+    tree = FenwickTree([3, 0, 5, 1])
+    assert [tree.find(t) for t in range(tree.total)] == [0, 0, 0, 2, 2, 2, 2, 2, 3]
+    tree.add(2, -5)
+    assert [tree.find(t) for t in range(tree.total)] == [0, 0, 0, 3]
+
+
+def test_weighted_draw_never_repeats_and_skips_zero_weight_last():
+    draw = WeightedDraw(50, lambda pos: 1 if pos == 7 else 1000)
+    rng = random.Random(1)
+    picked = [draw.draw(rng) for _ in range(50)]
+    assert sorted(picked) == list(range(50)) and draw.remaining == 0
+    assert picked.index(7) > 25  # light word comes late
+    with pytest.raises(IndexError):
+        draw.pick(rng)
+
+
+def test_adaptive_selection_favours_words_near_target(logic):
+    stats = WordStats(len(logic.words_all))
+    banana, orange = logic.dictionary.word_id("BANANA"), logic.dictionary.word_id("ORANGE")
+    for _ in range(20):
+        stats.record(orange, won=False)  # never solved
+    assert stats.weight(banana, 0.7) > 50 * stats.weight(orange, 0.7)
+
+    firsts = []
+    for seed in range(40):
+        session = WordGameLogic(logic.word_file, seed=seed, word_stats=stats, adaptive=True)
+        firsts.append(session.next_word("Medium")[0])
+    assert firsts.count("BANANA") > 35
+
+
+def test_adaptive_weights_follow_results_without_rebuilding(logic):
+    stats = WordStats(len(logic.words_all))
+    session = WordGameLogic(logic.word_file, seed=3, word_stats=stats, adaptive=True)
+    session.next_word("Medium")
+    tree = stats.tree(logic.index, 0.7)
+    session.start_run()
+    session.next_word("Medium")
+    assert stats.tree(logic.index, 0.7) is tree  # shared, not rebuilt per run
+
+    orange = logic.dictionary.word_id("ORANGE")
+    pos = logic.index.position_of(orange)
+    for _ in range(20):
+        stats.record(orange, won=False)
+    assert tree.weights[pos] == stats.weight(orange, 0.7) < WordStats.WEIGHT_SCALE
+    assert tree.prefix(tree.size) == sum(tree.weights)
+
+
+def test_round_results_feed_word_stats(logic):
+    stats = WordStats(len(logic.words_all))
+    session = WordGameLogic(logic.word_file, seed=1, word_stats=stats)
+    word, _, _ = session.next_word("Easy")
+    session.record_win(2, 4.0)
+    other, _, _ = session.next_word("Easy")
+    session.record_loss()
+    session.record_loss()  # the round's result is only counted once
+
+    won, lost = logic.dictionary.word_id(word), logic.dictionary.word_id(other)
+    assert (stats.plays[won], stats.wins[won], stats.average_time(won)) == (1, 1, 4.0)
+    assert (stats.plays[lost], stats.wins[lost]) == (1, 0)
+    assert stats.solve_rates(logic.words_all) == {word: 1.0, other: 0.0}
+
+
+def test_words_drawn_ahead_count_once_recorded(logic):
+    word, _, _ = logic.draw_word("Easy")
+    assert logic.remaining_counts()["Easy"] == 2 and logic.total_rounds == 0
+    ahead, _, _ = logic.draw_word("Easy")  # prefetched while word is played
+    assert ahead != word and logic.used_words == {word, ahead}
+    with pytest.raises(RuntimeError):
+        logic.draw_word("Easy")
+
+    logic.record_round("Easy", word)
+    assert logic.remaining_counts()["Easy"] == 1 and logic.total_rounds == 1
+    logic.record_round("Easy", ahead)
+    assert logic.remaining_counts()["Easy"] == 0 and logic.total_rounds == 2
+
+    logic.draw_word("Medium")
+    logic.start_run()  # an abandoned prefetch goes back into the pool
+    assert logic.remaining_counts() == {"Easy": 2, "Medium": 2, "Hard": 1}
+
+
+def test_word_stats_are_fed_by_drawn_id(tmp_path):
+    word_file = tmp_path / "words.txt"
+    word_file.write_text("KIWI\nMILK\nPEAR\n", encoding="utf-8")
+    dictionary = load_dictionary(str(word_file), use_mmap=True)
+    stats = WordStats(len(dictionary.words))
+    session = WordGameLogic(dictionary=dictionary, seed=1, word_stats=stats)
+    word, _, _ = session.draw_word("Easy")
+    ahead, _, _ = session.draw_word("Easy")  # prepared early, as the GUI does
+    session.record_round("Easy", word)
+    session.record_win(1, 2.0)
+    session.record_round("Easy", ahead)
+    session.record_loss()
+
+    assert dictionary._signatures is None  # no word -> id lookup was needed
+    assert stats.wins[dictionary.words.index(word)] == 1
+    assert stats.plays[dictionary.words.index(ahead)] == 1 and sum(stats.plays) == 2
+
+
+def test_server_keeps_word_stats_only_when_adaptive(logic):
+    sessions = GameSessions(logic.word_file)
+    plain = sessions.handle({"cmd": "start"})["session"]
+    adaptive = sessions.handle({"cmd": "start", "adaptive": True})["session"]
+    assert sessions.word_stats is None and sessions.sessions[plain].logic.word_stats is None
+    assert sessions.sessions[adaptive].logic.word_stats is not None
+    assert GameSessions(logic.word_file, adaptive=True).word_stats is not None
+
+
+def test_benchmark_comparison_flags_regressions():
+    baseline = {"hot": {"1000": {"next_word": {"seconds": 1e-5, "calls": 10000}, "init": {"seconds": 0.1, "peak_mb": 10.0}}}}
+    same = {"hot": {"1000": {"next_word": {"seconds": 1.2e-5}, "init": {"seconds": 0.1, "peak_mb": 11.0}}}}
+    assert compare_results(same, baseline) == []
+
+    worse = {"hot": {"1000": {"next_word": {"seconds": 3e-5}, "init": {"seconds": 0.1, "peak_mb": 20.0}},
+                     "2000": {"next_word": {"seconds": 1.0}}}}  # not in the baseline
+    regressions = compare_results(worse, baseline)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("hot/1000/next_word/seconds")
+    assert regressions[1].startswith("hot/1000/init/peak_mb")
+
+    # a few microseconds in total is noise, however large the ratio
+    tiny = {"scramble": {"seconds": 2e-6, "calls": 1}, "batch": {"seconds": 1e-6, "calls": 100}}
+    slower = {"scramble": {"seconds": 9e-6, "calls": 1}, "batch": {"seconds": 5e-6, "calls": 100}}
+    assert compare_results(slower, tiny) == []
+    assert len(compare_results(slower, tiny, min_duration=1e-7)) == 2
+
+
+def test_benchmark_per_call_rejects_zero_calls():
+    with pytest.raises(ValueError):
+        per_call(lambda: None, 0)
+
+
+def test_metrics_count_hot_paths(logic, tmp_path):
+    metrics = Metrics()
+    session = WordGameLogic(logic.word_file, seed=2, metrics=metrics)
+    word, _, _ = session.next_word("Easy")
+    session.is_correct_guess("NOPE", word)
+    session.is_correct_guess(word, word)
+    session.record_win(2, 3.0)
+    session.next_word("Easy")
+    session.record_loss("timeout")
+    with pytest.raises(RuntimeError):
+        session.next_word("Easy")
+    make_scrambled("AB", random.Random(0), reject={"AB", "BA"}, metrics=metrics)
+
+    snap = metrics.snapshot()
+    assert snap["counters"] == {
+        "runs_started_total": 1,
+        "words_drawn_total": 2,
+        "guesses_total": 2,
+        "correct_guesses_total": 1,
+        "timeouts_total": 1,
+        "pool_exhausted_total": 1,
+        "scramble_retries_total": 20,
+    }
+    assert snap["histograms"]["next_word_seconds"]["count"] == 2
+    assert snap["histograms"]["round_won_seconds"]["buckets"]["5.0"] == 1
+
+    path = str(tmp_path / "metrics.prom")
+    metrics.write(path)
+    text = open(path, encoding="utf-8").read()
+    assert "# TYPE word_scramble_guesses_total counter\nword_scramble_guesses_total 2\n" in text
+    assert 'word_scramble_next_word_seconds_bucket{le="+Inf"} 2' in text
+
+
+def test_server_metrics_command(logic):
+    sessions = GameSessions(logic.word_file)
+    assert sessions.handle({"cmd": "metrics"})["ok"] is False
+    sessions = GameSessions(logic.word_file, metrics=Metrics())
+    session = sessions.handle({"cmd": "start"})["session"]
+    sessions.handle({"cmd": "next", "session": session, "difficulty": "Easy"})
+    sessions.handle({"cmd": "solve", "session": session})
+    snap = sessions.handle({"cmd": "metrics"})["metrics"]
+    assert snap["counters"]["reveals_total"] == 1
+    text = sessions.handle({"cmd": "metrics", "format": "prometheus"})["metrics"]
+    assert "word_scramble_reveals_total 1" in text
+
+
+def test_word_draw_exclude_matches_taking():
+    for seed in range(20):
+        draw = WordDraw(30)
+        excluded = random.Random(seed).sample(range(30), 12)
+        draw.exclude(excluded)
+        assert sorted(draw.drawn()) == sorted(excluded)
+        rest = [draw.draw(random.Random(seed)) for _ in range(18)]
+        assert sorted(rest + excluded) == list(range(30))
+
+        # also after draws, sparse and dense
+        for first in (3, 25):
+            draw, rng = WordDraw(30), random.Random(seed)
+            drawn = [draw.draw(rng) for _ in range(first)]
+            excluded = rng.sample([p for p in range(30) if p not in drawn], (30 - first) // 2)
+            draw.exclude(excluded)
+            assert sorted(draw.drawn()) == sorted(drawn + excluded)
+            rest = [draw.draw(rng) for _ in range(draw.remaining)]
+            assert sorted(drawn + excluded + rest) == list(range(30))
+            with pytest.raises(ValueError):
+                draw.exclude([drawn[0]])
+
+    draw = WordDraw(10)
+    with pytest.raises(ValueError):
+        draw.exclude([4, 9, 4])
+    assert sorted(draw.drawn()) == [4, 9]
+
+
+def test_hot_reload_keeps_run_state(tmp_path):
+    word_file = tmp_path / "words.txt"
+    word_file.write_text("KIWI\nMILK\nPEAR\nPLUM\nBANANA\n", encoding="utf-8")
+    session = WordGameLogic(str(word_file), seed=3)
+    first, _, _ = session.next_word("Easy")
+    second, _, _ = session.next_word("Easy")  # round still in progress
+    old = session.dictionary
+
+    gone = next(w for w in ("KIWI", "MILK", "PEAR", "PLUM") if w not in (first, second))
+    kept = [w for w in ("KIWI", "MILK", "PEAR", "PLUM") if w != gone]
+    word_file.write_text("\n".join(kept + ["FIG", "LIME", "BANANA"]) + "\n", encoding="utf-8")
+    watcher = DictionaryWatcher(old)
+    diff = watcher.check()
+    assert diff.added == ["FIG", "LIME"] and diff.removed == [gone]
+    assert watcher.check() is None
+    assert load_dictionary(str(word_file)) is watcher.dictionary is old.successor
+
+    assert session.is_correct_guess(second, second)
+    session.record_win(1, 2.0)
+    rest = [session.next_word("Easy")[0] for _ in range(3)]
+    assert session.dictionary is watcher.dictionary
+    assert sorted(rest + [first, second]) == sorted(kept + ["FIG", "LIME"])
+    assert session.used_words == set(rest + [first, second])
+    with pytest.raises(RuntimeError):
+        session.next_word("Easy")
+
+
+def test_server_carries_word_stats_over_reload(tmp_path):
+    word_file = tmp_path / "words.txt"
+    word_file.write_text("KIWI\nMILK\n", encoding="utf-8")
+    sessions = GameSessions(str(word_file), adaptive=True)
+    session = sessions.handle({"cmd": "start", "seed": 1})["session"]
+    sessions.handle({"cmd": "next", "session": session, "difficulty": "Easy"})
+    word = sessions.sessions[session].word
+    sessions.handle({"cmd": "guess", "session": session, "guess": word})
+
+    word_file.write_text("FIG\nKIWI\nMILK\n", encoding="utf-8")
+    watcher = DictionaryWatcher(sessions.dictionary, on_reload=sessions._on_reload)
+    assert watcher.check()
+    stats = sessions.word_stats
+    assert stats.wins[watcher.dictionary.word_id(word)] == 1
+    reply = sessions.handle({"cmd": "next", "session": session, "difficulty": "Easy"})
+    assert reply["remaining"]["Easy"] == 1 and sessions.sessions[session].word != word
+    assert sessions.sessions[session].logic.word_stats is stats
+
+
+def test_categories_load_lazily_and_evict_least_recent(tmp_path):
+    lists = tmp_path / "lists"
+    lists.mkdir()
+    (lists / "fruit.txt").write_text("KIWI\nPEAR\nPLUM\n", encoding="utf-8")
+    (lists / "dairy.txt").write_text("MILK\nBRIE\nFETA\n", encoding="utf-8")
+    (lists / "notes.md").write_text("not a category\n", encoding="utf-8")
+    registry = CategoryRegistry(str(lists), memory_budget_mb=0.0001)
+    assert registry.names() == ["dairy", "fruit"] and "Fruit" in registry
+    assert registry.loaded() == []
+    with pytest.raises(ValueError):
+        registry.get("vegetables")
+
+    fruit = registry.get("Fruit")
+    assert "PEAR" in fruit and registry.get("fruit") is fruit
+    dairy = registry.get("dairy")  # over budget: fruit goes
+    assert registry.loaded() == ["dairy"] and registry.evictions == 1
+    assert registry.loaded_bytes == dairy.approx_bytes()
+    assert registry.get("fruit") is not fruit  # loaded again
+
+
+def test_switching_category_keeps_scoreboard(tmp_path):
+    lists = tmp_path / "lists"
+    lists.mkdir()
+    (lists / "dairy.txt").write_text("MILK\nBRIE\nFETA\n", encoding="utf-8")
+    fruit = tmp_path / "fruit.txt"
+    fruit.write_text("KIWI\nPEAR\nPLUM\n", encoding="utf-8")
+    registry = CategoryRegistry(str(lists), extra={"fruit": str(fruit)})
+    session = WordGameLogic(dictionary=registry.get("fruit"), seed=2, adaptive=True)
+    session.start_run()
+    word, _, _ = session.next_word("Easy")
+    session.is_correct_guess(word, word)
+    session.record_win(1, 3.0)
+
+    session.switch_dictionary(registry.get("dairy"))
+    assert session.total_rounds == session.rounds_won == 1
+    assert session.used_words == set() and len(session.word_stats.plays) == 3
+    assert {session.next_word("Easy")[0] for _ in range(3)} == {"MILK", "BRIE", "FETA"}
+
+
+def test_server_starts_sessions_in_a_category(logic, tmp_path):
+    lists = tmp_path / "lists"
+    lists.mkdir()
+    (lists / "dairy.txt").write_text("MILK\nBRIE\nFETA\n", encoding="utf-8")
+    sessions = GameSessions(logic.word_file, categories=CategoryRegistry(str(lists)))
+    assert sessions.handle({"cmd": "categories"})["categories"] == ["dairy"]
+    assert not sessions.handle({"cmd": "start", "category": "games"})["ok"]
+    session = sessions.handle({"cmd": "start", "category": "dairy", "seed": 4})["session"]
+    sessions.handle({"cmd": "next", "session": session, "difficulty": "Easy"})
+    assert sessions.sessions[session].word in ("MILK", "BRIE", "FETA")
+    assert sessions.sessions[session].logic.word_stats is None
+
+
+def test_puzzle_packs_are_reproducible_and_round_trip(tmp_path):
+    rng = random.Random(0)
+    words = {"".join(rng.choice("ABCDEFGHIJKLMNOP") for _ in range(n)) for n in (4, 6, 9) * 40}
+    word_file = tmp_path / "words.txt"
+    word_file.write_text("\n".join(words) + "\n", encoding="utf-8")
+    dictionary = load_dictionary(str(word_file))
+
+    pack = list(generate_puzzles(dictionary, 25, seed=7, chunk_size=4))
+    assert pack == list(generate_puzzles(dictionary, 25, seed=7, workers=2, chunk_size=4))
+    assert pack != list(generate_puzzles(dictionary, 25, seed=8, chunk_size=4))
+    assert len(pack) == 75 and len({p[1] for p in pack}) == 75
+    for difficulty, word, scrambled, order in pack:
+        assert scrambled == scramble_word(word, order) and scrambled != word
+        assert dictionary.index.difficulty_at(dictionary.index.position_of(dictionary.word_id(word))) == difficulty
+
+    with open(tmp_path / "pack.wsp", "wb") as f:
+        write_binary(pack, f, len(pack))
+    with open(tmp_path / "pack.jsonl", "w", encoding="utf-8") as f:
+        write_jsonl(pack, f)
+    assert list(read_pack(str(tmp_path / "pack.wsp"))) == pack
+    assert list(read_pack(str(tmp_path / "pack.jsonl"))) == pack
+    with pytest.raises(ValueError):
+        generate_puzzles(dictionary, 1000)
+
+    # compiled lists reject real words with a Bloom filter, whose false
+    # positives must not depend on the process
+    compiled = str(tmp_path / "words.wsc")
+    compile_word_list(sorted(words), compiled)
+    command = [
+        sys.executable, "word_scramble_packs.py", "-", "--word-file", compiled,
+        "--count", "25", "--seed", "7", "--avoid-real-words",
+    ]
+    here = os.path.dirname(os.path.abspath(__file__))
+    runs = [subprocess.run(command, cwd=here, capture_output=True, text=True, check=True).stdout for _ in range(2)]
+    assert runs[0] == runs[1] and len(runs[0].splitlines()) == 75
+
+
 def test_repr_does_not_crash(logic):
     s = repr(logic)
     assert isinstance(s, str)
@@ -0,0 +1,220 @@
+"""
+Adaptive word selection: words are drawn with a probability that favours
+those whose solve rate is close to a target success rate.
+
+WordStats keeps running per-word results (shared by every session playing
+the same dictionary) and, once a session draws adaptively, a Fenwick tree
+of every word's weight in index order. Each result updates the tree in
+O(log n), so weights follow play as it happens. WeightedDraw is a drop-in
+for WordDraw that samples one bucket of that shared tree, skipping the
+words its run has already drawn, so a run never rebuilds the tree.
+"""
+import random
+import threading
+from array import array
+from bisect import insort
+from itertools import accumulate
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+
+class FenwickTree:
+    """Prefix sums over non-negative integer weights, with O(log n) search."""
+
+    __slots__ = ("size", "tree", "weights", "total")
+
+    def __init__(self, weights: Sequence[int]):
+        n = len(weights)
+        self.size = n
+        self.weights = array("q", weights)
+        # node i covers weights (i - lowbit(i), i]: a difference of prefix sums
+        prefix = list(accumulate(self.weights, initial=0))
+        self.tree = array("q", [0] + [prefix[i] - prefix[i & (i - 1)] for i in range(1, n + 1)])
+        self.total = prefix[-1]
+
+    def add(self, pos: int, delta: int) -> None:
+        self.weights[pos] += delta
+        self.total += delta
+        i, tree, n = pos + 1, self.tree, self.size
+        while i <= n:
+            tree[i] += delta
+            i += i & -i
+
+    def prefix(self, pos: int) -> int:
+        """Sum of the weights before pos."""
+        total, tree = 0, self.tree
+        while pos > 0:
+            total += tree[pos]
+            pos &= pos - 1
+        return total
+
+    def find(self, target: int) -> int:
+        """Position whose weight covers target, for 0 <= target < total."""
+        pos, tree = 0, self.tree
+        step = 1 << self.size.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and tree[nxt] <= target:
+                pos = nxt
+                target -= tree[nxt]
+            step >>= 1
+        return pos
+
+
+class WordStats:
+    """
+    Running results per word id: rounds played, rounds won and total time
+    of the wins. Thread-safe; one instance is shared by all sessions of a
+    dictionary.
+    tree(index, target) is the weight of every word, in the order of
+    index.ids, built on first use and kept up to date by record().
+    """
+
+    # pseudo-rounds at the target rate, so one result does not swing a word
+    PRIOR_ROUNDS = 2
+    WEIGHT_SCALE = 1000
+
+    def __init__(self, size: int):
+        self.plays = array("I", [0]) * size
+        self.wins = array("I", [0]) * size
+        self.win_time = array("f", [0.0]) * size
+        self.successor: Optional["WordStats"] = None  # see remap
+        self.lock = threading.Lock()  # also held by WeightedDraw while it samples
+        self._index: Any = None  # the WordIndex the trees are laid out by
+        self._trees: Dict[float, FenwickTree] = {}  # by target success rate
+
+    def record(self, word_id: int, won: bool, time_used_seconds: float = 0.0) -> None:
+        with self.lock:
+            self.plays[word_id] += 1
+            if won:
+                self.wins[word_id] += 1
+                self.win_time[word_id] += time_used_seconds
+            if self._trees:
+                pos = self._index.position_of(word_id)
+                if pos >= 0:
+                    for target, tree in self._trees.items():
+                        tree.add(pos, self.weight(word_id, target) - tree.weights[pos])
+
+    def tree(self, index: Any, target: float) -> FenwickTree:
+        """Weights by position in index.ids; call with lock held."""
+        if index is not self._index:
+            self._index, self._trees = index, {}
+        tree = self._trees.get(target)
+        if tree is None:
+            ids, plays, weight = index.ids, self.plays, self.weight
+            # an unplayed word's solve rate is the target itself: full weight
+            weights = array("q", [self.WEIGHT_SCALE]) * len(ids)
+            for pos, word_id in enumerate(ids):
+                if plays[word_id]:
+                    weights[pos] = weight(word_id, target)
+            tree = self._trees[target] = FenwickTree(weights)
+        return tree
+
+    def solve_rate(self, word_id: int, prior: float = 0.5) -> float:
+        """Share of rounds won, pulled towards prior while there are few."""
+        return (self.wins[word_id] + prior * self.PRIOR_ROUNDS) / (self.plays[word_id] + self.PRIOR_ROUNDS)
+
+    def average_time(self, word_id: int) -> Optional[float]:
+        wins = self.wins[word_id]
+        return self.win_time[word_id] / wins if wins else None
+
+    def weight(self, word_id: int, target: float) -> int:
+        """1..WEIGHT_SCALE: highest when the word's solve rate is the target."""
+        miss = abs(self.solve_rate(word_id, target) - target) / max(target, 1.0 - target)
+        return max(1, round(self.WEIGHT_SCALE * (1.0 - miss) ** 2))
+
+    def remap(self, words: Sequence[str], new_size: int, new_id_of: Callable[[str], Optional[int]]) -> "WordStats":
+        """
+        Stats for a reloaded word list: results of words (this list) that are
+        still in the new one carry over. This instance then points to the
+        new one as successor, so sessions can follow it.
+        """
+        new = WordStats(new_size)
+        with self.lock:
+            for i, plays in enumerate(self.plays):
+                if plays:
+                    j = new_id_of(words[i])
+                    if j is not None:
+                        new.plays[j] = plays
+                        new.wins[j] = self.wins[i]
+                        new.win_time[j] = self.win_time[i]
+            self.successor = new
+        return new
+
+    def solve_rates(self, words: Sequence[str]) -> Dict[str, float]:
+        """Observed solve rate of every word played so far (for FeatureModel)."""
+        return {words[i]: self.wins[i] / n for i, n in enumerate(self.plays) if n}
+
+
+class WeightedDraw:
+    """
+    Draws positions from one difficulty bucket without repeats, each with
+    probability proportional to its current weight. Same interface as
+    WordDraw, but a slot is simply the position.
+    The weights are the shared tree of a WordStats (or, for a standalone
+    draw, a private tree of weight_of per position); this draw only keeps
+    the positions it has taken. A pick samples the bucket's total minus the
+    taken weights and steps over taken positions: O(k log n) for k taken,
+    so starting a run costs nothing and results recorded by any session
+    count from the next pick.
+    """
+
+    __slots__ = ("size", "remaining", "start", "_tree", "_lock", "taken", "_sorted")
+
+    def __init__(
+        self,
+        size: int,
+        weight_of: Optional[Callable[[int], int]] = None,
+        stats: Optional[WordStats] = None,
+        index: Any = None,
+        target: float = 0.7,
+        start: int = 0,
+    ):
+        self.size = size
+        self.remaining = size
+        self.start = start  # where the bucket begins in the tree
+        if stats is not None:
+            self._tree: Callable[[], FenwickTree] = lambda: stats.tree(index, target)
+            self._lock: Any = stats.lock
+        else:
+            tree = FenwickTree([weight_of(pos) for pos in range(size)])
+            self._tree = lambda: tree
+            self._lock = threading.Lock()
+        self.taken = array("I")  # in draw order
+        self._sorted: List[int] = []
+
+    def exclude(self, positions: Iterable[int]) -> None:
+        """Draw the given (distinct, unused) positions without sampling them."""
+        for pos in positions:
+            self.take(pos)
+
+    def draw(self, rng: Optional[random.Random] = None) -> int:
+        return self.take(self.pick(rng))
+
+    def pick(self, rng: Optional[random.Random] = None) -> int:
+        if not self.remaining:
+            raise IndexError("bucket exhausted")
+        start = self.start
+        with self._lock:
+            tree = self._tree()
+            weights = tree.weights
+            base = tree.prefix(start)
+            total = tree.prefix(start + self.size) - base - sum(weights[start + j] for j in self._sorted)
+            target = base + (rng or random).randrange(total)
+            # shift past every taken position at or before the target
+            for j in self._sorted:
+                if tree.prefix(start + j) > target:
+                    break
+                target += weights[start + j]
+            return tree.find(target) - start
+
+    def peek(self, j: int) -> int:
+        return j
+
+    def take(self, j: int) -> int:
+        self.taken.append(j)
+        insort(self._sorted, j)
+        self.remaining -= 1
+        return j
+
+    def drawn(self) -> Sequence[int]:
+        return self.taken
@@ -0,0 +1,125 @@
+import queue
+import threading
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from word_scramble_logic import RNG, make_rng, make_scrambled, make_scrambled_batch
+
+Scramble = Tuple[str, List[int]]
+
+
+class ScrambleCache:
+    """
+    Scramble provider that keeps ready-made scrambles for recently used words.
+    - each cached word holds up to per_word pre-generated (scrambled, order) pairs
+    - at most max_words words are cached; the least recently used is evicted
+    - a background thread tops up a word's pool after it is hit or missed
+    - every scramble is handed out once, so players never share one
+
+    Pass it to WordGameLogic(scrambler=...). Cached scrambles come from the
+    cache's own rng, so a seeded session is only fully reproducible on misses.
+    """
+
+    def __init__(
+        self,
+        per_word: int = 8,
+        max_words: int = 10_000,
+        seed: Optional[int] = None,
+        background: bool = True,
+    ):
+        self.per_word = per_word
+        self.max_words = max_words
+        self.rng = make_rng(seed)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._pools: "OrderedDict[str, Deque[Scramble]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending: Set[str] = set()
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        if background:
+            self._worker = threading.Thread(target=self._run, name="scramble-cache", daemon=True)
+            self._worker.start()
+
+    # -------------------------
+    # Provider API
+    # -------------------------
+    def get(self, word: str, rng: Optional[RNG] = None) -> Scramble:
+        """Return a scramble for word, from the pool when one is ready."""
+        with self._lock:
+            pool = self._pools.get(word)
+            if pool:
+                scramble = pool.popleft()
+                self._pools.move_to_end(word)
+                self.hits += 1
+            else:
+                scramble = None
+                self.misses += 1
+            low = pool is None or len(pool) < self.per_word // 2
+        if low:
+            self._request(word)
+        if scramble is None:
+            scramble = make_scrambled(word, rng)
+        return scramble
+
+    def prefetch(self, words: Iterable[str]) -> None:
+        """Queue words (e.g. the most popular ones) for pre-generation."""
+        for word in words:
+            self._request(word)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "words": len(self._pools),
+                "scrambles": sum(len(p) for p in self._pools.values()),
+            }
+
+    def close(self) -> None:
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+
+    # -------------------------
+    # Filling
+    # -------------------------
+    def _request(self, word: str) -> None:
+        with self._lock:
+            if word in self._pending:
+                return
+            self._pending.add(word)
+        if self._worker is None:
+            self.fill(word)
+        else:
+            self._queue.put(word)
+
+    def fill(self, word: str) -> None:
+        """Top up word's pool to per_word scrambles, evicting LRU words if needed."""
+        with self._lock:
+            pool = self._pools.get(word)
+            missing = self.per_word - (len(pool) if pool else 0)
+        fresh = make_scrambled_batch([word] * missing, self.rng) if missing > 0 else []
+
+        with self._lock:
+            self._pending.discard(word)
+            pool = self._pools.get(word)
+            if pool is None:
+                pool = self._pools[word] = deque()
+            pool.extend(fresh[: self.per_word - len(pool)])
+            self._pools.move_to_end(word)
+            while len(self._pools) > self.max_words:
+                self._pools.popitem(last=False)
+                self.evictions += 1
+
+    def _run(self) -> None:
+        while True:
+            word = self._queue.get()
+            if word is None:
+                return
+            self.fill(word)
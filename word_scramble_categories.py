@@ -0,0 +1,98 @@
+"""
+Themed word lists ("categories") loaded on demand.
+
+CategoryRegistry finds the word lists in a directory when it is created
+(one category per *.txt or compiled *.wsc file, named after the file) but
+loads and indexes a list only the first time it is asked for. Loaded lists
+are kept in least-recently-used order and the oldest are dropped once their
+estimated size exceeds the memory budget, so a server can offer hundreds of
+categories while holding only the popular ones.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from word_scramble_difficulty import DifficultyModel
+from word_scramble_logic import WordDictionary, forget_dictionary, load_dictionary
+from word_scramble_wordlist import resolve_path
+
+CATEGORY_SUFFIXES = (".txt", ".wsc")
+
+
+class CategoryRegistry:
+    """
+    Word lists by category name. Thread-safe.
+    - names() lists what was found in directory plus any extra lists
+    - get(name) returns the category's shared WordDictionary, loading it on
+      first use and evicting least recently used ones over memory_budget
+    Evicted dictionaries stay valid for sessions still playing them; they
+    are freed when those sessions end.
+    """
+
+    def __init__(
+        self,
+        directory: str = "word_lists",
+        extra: Optional[Dict[str, str]] = None,
+        memory_budget_mb: float = 256.0,
+        use_mmap: bool = False,
+        model: Optional[DifficultyModel] = None,
+    ):
+        self.directory = directory
+        self.memory_budget = int(memory_budget_mb * 1e6)
+        self.use_mmap = use_mmap
+        self.model = model
+        self.paths: Dict[str, str] = {}
+        path = resolve_path(directory)
+        if os.path.isdir(path):
+            for entry in sorted(os.listdir(path)):
+                stem, suffix = os.path.splitext(entry)
+                if suffix in CATEGORY_SUFFIXES and stem.lower() not in self.paths:
+                    self.paths[stem.lower()] = os.path.join(path, entry)
+        for name, file_name in (extra or {}).items():
+            self.paths[name.lower()] = file_name
+
+        self._loaded: "OrderedDict[str, Tuple[WordDictionary, int]]" = OrderedDict()
+        self.loaded_bytes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def names(self) -> List[str]:
+        return sorted(self.paths)
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and name.lower() in self.paths
+
+    def get(self, name: str) -> WordDictionary:
+        key = name.lower()
+        file_name = self.paths.get(key)
+        if file_name is None:
+            raise ValueError(f"Unknown category: {name}")
+        with self._lock:
+            loaded = self._loaded.get(key)
+            if loaded is not None:
+                dictionary = loaded[0]
+                if dictionary.successor is None:
+                    self._loaded.move_to_end(key)
+                    return dictionary
+                # hot-reloaded since: re-measure the new version
+                self._drop(key)
+            dictionary = load_dictionary(file_name, self.use_mmap, self.model)
+            size = dictionary.approx_bytes()
+            self._loaded[key] = (dictionary, size)
+            self.loaded_bytes += size
+            while self.loaded_bytes > self.memory_budget and len(self._loaded) > 1:
+                oldest = next(iter(self._loaded))
+                forget_dictionary(self._drop(oldest))
+                self.evictions += 1
+            return dictionary
+
+    def _drop(self, key: str) -> WordDictionary:
+        dictionary, size = self._loaded.pop(key)
+        self.loaded_bytes -= size
+        return dictionary
+
+    def loaded(self) -> List[str]:
+        """Loaded categories, least recently used first."""
+        with self._lock:
+            return list(self._loaded)
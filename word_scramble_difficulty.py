@@ -0,0 +1,132 @@
+"""
+Difficulty models: every word gets one score at load time and each
+difficulty is a half-open score range [lo, hi).
+
+WordIndex sorts word ids by score once, so every difficulty is still one
+contiguous slice of ids and picking a word stays O(1). Scores can be
+stored in a compiled word list (see word_scramble_wordlist) so they are
+not recomputed on every start.
+"""
+import math
+from array import array
+from collections import Counter
+from typing import Dict, Mapping, Optional, Protocol, Sequence, Tuple
+
+# Difficulty buckets as inclusive word-length ranges (None = no upper bound).
+# This is the only place the bucketing rules live; the models below and
+# WordIndex resolve them.
+DIFFICULTY_LENGTHS: Dict[str, Tuple[int, Optional[int]]] = {
+    "Easy": (2, 5),
+    "Medium": (6, 8),
+    "Hard": (9, None),
+}
+
+# Half-open score ranges (None = no upper bound), lowest difficulty first.
+ScoreRanges = Dict[str, Tuple[float, Optional[float]]]
+
+LENGTH_RANGES: ScoreRanges = {
+    d: (lo, None if hi is None else hi + 1) for d, (lo, hi) in DIFFICULTY_LENGTHS.items()
+}
+
+
+class DifficultyModel(Protocol):
+    """Scores words; a higher score is a harder word."""
+
+    name: str
+    ranges: ScoreRanges
+
+    def score_words(self, words: Sequence[str]) -> array: ...
+
+
+class LengthModel:
+    """Score = word length, so the ranges are exactly DIFFICULTY_LENGTHS."""
+
+    name = "length"
+
+    def __init__(self, ranges: Optional[ScoreRanges] = None):
+        self.ranges = ranges or LENGTH_RANGES
+
+    def score_words(self, words: Sequence[str]) -> array:
+        return array("f", (len(w) for w in words))
+
+
+class FeatureModel:
+    """
+    Score in "letters": the word length, adjusted by
+    - letter rarity: mean -log2 frequency of its letters across the list,
+      relative to the list's average word (rare letters are harder)
+    - repeated letters: fewer distinct letters to place is easier
+    - anagrams: every anagram in the list is also accepted, so each one
+      makes the word easier
+    - solve rate: historical share of rounds won with the word, if known
+    Because the unit is still letters, the default ranges are LENGTH_RANGES.
+    """
+
+    name = "features"
+
+    def __init__(
+        self,
+        rarity_weight: float = 1.0,
+        repeat_weight: float = 0.5,
+        anagram_weight: float = 0.5,
+        solve_weight: float = 4.0,
+        solve_rates: Optional[Mapping[str, float]] = None,
+        ranges: Optional[ScoreRanges] = None,
+    ):
+        self.rarity_weight = rarity_weight
+        self.repeat_weight = repeat_weight
+        self.anagram_weight = anagram_weight
+        self.solve_weight = solve_weight
+        self.solve_rates = solve_rates or {}
+        self.ranges = ranges or LENGTH_RANGES
+
+    def score_words(self, words: Sequence[str]) -> array:
+        letters: Counter = Counter()
+        signatures: Counter = Counter()
+        for w in words:
+            letters.update(w)
+        # in-memory lists may repeat a word; it is still one anagram
+        for w in set(words) if isinstance(words, list) else words:
+            signatures["".join(sorted(w))] += 1
+        total = sum(letters.values()) or 1
+        surprise = {ch: -math.log2(n / total) for ch, n in letters.items()}
+        # mean surprise of all letters = the average word's rarity
+        baseline = sum(n * surprise[ch] for ch, n in letters.items()) / total
+
+        scores = array("f", bytes(4 * len(words)))
+        for i, w in enumerate(words):
+            if not w:
+                continue
+            score = len(w)
+            score += self.rarity_weight * (sum(surprise[ch] for ch in w) / len(w) - baseline)
+            score -= self.repeat_weight * (len(w) - len(set(w)))
+            score -= self.anagram_weight * (signatures["".join(sorted(w))] - 1)
+            rate = self.solve_rates.get(w)
+            if rate is not None:
+                score += self.solve_weight * (0.5 - rate)
+            scores[i] = score
+        return scores
+
+
+DIFFICULTY_MODELS = {"length": LengthModel, "features": FeatureModel}
+
+
+def get_model(name: str) -> DifficultyModel:
+    """A model with default settings, by name."""
+    factory = DIFFICULTY_MODELS.get(name)
+    if factory is None:
+        raise ValueError(f"Unknown difficulty model: {name}")
+    return factory()
+
+
+def has_default_settings(model: DifficultyModel) -> bool:
+    """
+    Whether model scores words like get_model(model.name), the only scores a
+    compiled word list stores. ranges are not compared: they only cut the
+    scores into difficulties.
+    """
+    factory = DIFFICULTY_MODELS.get(model.name)
+    if factory is None or type(model) is not factory:
+        return False
+    settings = {k: v for k, v in vars(model).items() if k != "ranges"}
+    return settings == {k: v for k, v in vars(factory()).items() if k != "ranges"}
@@ -1,14 +1,39 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import time
-
-from word_scramble_logic import WordGameLogic
+from concurrent.futures import Future, ThreadPoolExecutor
+import getpass
+import os
+import threading
+from word_scramble_categories import CategoryRegistry
+from word_scramble_leaderboard import Leaderboard
+from word_scramble_logic import RoundHints, RoundTimer, WordGameLogic, difficulty_to_seconds
+from word_scramble_metrics import Metrics
+from word_scramble_reload import DictionaryWatcher
+from word_scramble_scores import ScoreStore
+from word_scramble_wordlist import resolve_path
 
 
 class WordScrambleGUI:
-    def __init__(self, root: tk.Tk, word_file: str = "word_list.txt"):
+    def __init__(
+        self,
+        root: tk.Tk,
+        word_file: str = "word_list.txt",
+        player=None,
+        score_store=None,
+        leaderboard=None,
+        adaptive=False,
+        metrics=None,
+        metrics_file=None,
+        categories=None,
+        category="food",
+    ):
         self.root = root
-        root.title("Word Scramble - Food Edition")
+        # categories is an optional CategoryRegistry of themed word lists;
+        # category names the one word_file holds
+        self.categories = categories
+        self.category = category
+        self.metrics_file = metrics_file  # metrics are written here on close
+        root.title(f"Word Scramble - {category.title()} Edition")
         root.geometry("700x460")
         root.resizable(False, False)
 
@@ -24,20 +49,42 @@ class WordScrambleGUI:
 
         # Logic
         try:
-            self.logic = WordGameLogic(word_file)
+            self.logic = WordGameLogic(
+                word_file,
+                player=player,
+                score_store=score_store,
+                leaderboard=leaderboard,
+                adaptive=adaptive,
+                metrics=metrics,
+            )
         except Exception as e:
             messagebox.showerror("Error loading words", f"Couldn't load words:\n{e}")
             root.destroy()
             return
 
+        # Edits to the word file are picked up on the next word, keeping the run
+        self.watcher = DictionaryWatcher(self.logic.dictionary).start()
+
+        # Words are drawn on a single worker thread so the Tk loop never waits
+        # on the logic layer. Being single-threaded it also runs logic calls in
+        # submission order. prefetched holds the next word per difficulty.
+        # WordGameLogic is not thread-safe: both threads touch it only while
+        # holding logic_lock (see run_locked).
+        self.worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="word-prefetch")
+        self.logic_lock = threading.Lock()
+        self.prefetched = {}
+        self.pending_id = None
+        root.protocol("WM_DELETE_WINDOW", self.close)
+
         # GUI game state
         self.chosen_word = None
         self.scrambled_word = None
         self.attempts = 0
-        self.timer_seconds = 0
+        self.timer_seconds = 0  # value currently shown on the timer label
         self.timer_id = None
         self.round_active = False
-        self.round_start_time = None
+        self.round_timer = None
+        self.round_hints = None
 
         # Build UI
         self.build_start_screen()
@@ -51,19 +98,19 @@ class WordScrambleGUI:
         self.start_frame = tk.Frame(self.root, bg=self.bg_color)
         self.start_frame.place(relwidth=1, relheight=1)
 
-        title = tk.Label(
+        self.title_label = tk.Label(
             self.start_frame,
-            text="Word Scramble\nFood Edition",
+            text=f"Word Scramble\n{self.category.title()} Edition",
             font=("Segoe UI", 28, "bold"),
             bg=self.bg_color,
             fg=self.primary,
             justify="center",
         )
-        title.pack(pady=(30, 6))
+        self.title_label.pack(pady=(30, 6))
 
         subtitle = tk.Label(
             self.start_frame,
-            text="Guess the scrambled food word!",
+            text="Guess the scrambled word!" if self.categories is not None else "Guess the scrambled food word!",
             font=("Segoe UI", 12),
             bg=self.bg_color,
             fg=self.neutral,
@@ -90,6 +137,25 @@ class WordScrambleGUI:
         )
         difficulty_menu.grid(row=0, column=1)
 
+        # Category selector, when there are themed word lists to choose from
+        self.category_var = tk.StringVar(value=self.category.title())
+        if self.categories is not None and len(self.categories.names()) > 1:
+            tk.Label(
+                difficulty_frame,
+                text="Category:",
+                font=("Segoe UI", 11),
+                bg=self.bg_color,
+                fg=self.neutral,
+            ).grid(row=0, column=2, padx=(16, 8))
+            category_menu = ttk.Combobox(
+                difficulty_frame,
+                textvariable=self.category_var,
+                values=[name.title() for name in self.categories.names()],
+                state="readonly",
+                width=12,
+            )
+            category_menu.grid(row=0, column=3)
+
         # Timer hint
         self.timer_hint = tk.Label(
             self.start_frame, text="", font=("Segoe UI", 10), bg=self.bg_color, fg=self.neutral
@@ -121,6 +187,19 @@ class WordScrambleGUI:
             justify="center",
         ).pack(pady=(10, 0))
 
+    def run_locked(self, fn, *args, **kwargs):
+        """Call fn holding logic_lock; what the worker thread runs."""
+        with self.logic_lock:
+            return fn(*args, **kwargs)
+
+    def switch_category(self, category: str):
+        """Worker thread: play from category's word list, watching that file instead."""
+        dictionary = self.categories.get(category)
+        with self.logic_lock:
+            self.logic.switch_dictionary(dictionary)
+        self.watcher.close()
+        self.watcher = DictionaryWatcher(self.logic.dictionary).start()
+
     def update_timer_hint(self):
         diff = self.difficulty_var.get()
         secs = self.difficulty_to_seconds(diff)
@@ -130,8 +209,17 @@ class WordScrambleGUI:
         self.start_frame.lift()
 
     def start_game(self):
-        # initialize logic for run (keeps scoreboard by default)
-        self.logic.start_run(reset_scoreboard=False)
+        # initialize logic for run (keeps scoreboard by default); queued on the
+        # worker so it runs after any in-flight prefetch from the last run
+        self.prefetched.clear()
+        category = self.category_var.get().lower()
+        if category != self.category:
+            # the list is loaded on first use, on the worker like everything else
+            self.category = category
+            self.title_label.config(text=f"Word Scramble\n{category.title()} Edition")
+            self.root.title(f"Word Scramble - {category.title()} Edition")
+            self.worker.submit(self.switch_category, category)
+        self.worker.submit(self.run_locked, self.logic.start_run, reset_scoreboard=False)
         self.show_game_screen()
         self.new_round()
 
@@ -190,6 +278,9 @@ class WordScrambleGUI:
         self.btn_next = tk.Button(btn_frame, text="Next Word", width=12, command=self.new_round, bg="#5b835d")
         self.btn_next.grid(row=0, column=2, padx=6)
 
+        self.btn_hint = tk.Button(btn_frame, text="Hint", width=12, command=self.show_hint, bg="#b9c7e6")
+        self.btn_hint.grid(row=0, column=3, padx=6)
+
         back_frame = tk.Frame(self.game_frame, bg=self.bg_color)
         back_frame.pack(fill="x", pady=(12, 0), padx=12)
         back_btn = tk.Button(back_frame, text="Back to Start", command=self.back_to_start, bg="#a87f7f")
@@ -205,13 +296,15 @@ class WordScrambleGUI:
     # Game logic integration
     # -------------------------
     def difficulty_to_seconds(self, difficulty: str) -> int:
-        return {"Easy": 75, "Medium": 50, "Hard": 30}.get(difficulty, 50)
+        return difficulty_to_seconds(difficulty)
 
     def update_remaining_label(self):
-        rem = self.logic.remaining_counts()
+        with self.logic_lock:
+            rem = self.logic.remaining_counts()
         self.remaining_label.config(text=f"Words remaining — Easy: {rem['Easy']}  Medium: {rem['Medium']}  Hard: {rem['Hard']}")
 
     def new_round(self):
+        self.cancel_pending()
         # cancel any existing timer
         if self.timer_id:
             self.root.after_cancel(self.timer_id)
@@ -220,13 +313,31 @@ class WordScrambleGUI:
         self.attempts = 0
         self.update_attempts_label()
         self.result_label.config(text="", fg=self.neutral)
-        self.entry.config(state="normal")
-        self.btn_guess.config(state="normal")
-        self.round_active = True
+        # guesses stay off until the word is on screen
+        self.round_active = False
 
         difficulty = self.difficulty_var.get()
+        future = self.prefetched.pop(difficulty, None)
+        if future is None:
+            future = self.worker.submit(self.run_locked, self.logic.draw_word, difficulty)
+        self.scrambled_label.config(text="…")
+        self.show_word_when_ready(future, difficulty)
+
+    def prefetch(self, difficulty: str):
+        """Start drawing the next word for difficulty in the background."""
+        if difficulty not in self.prefetched:
+            self.prefetched[difficulty] = self.worker.submit(self.run_locked, self.logic.draw_word, difficulty)
+
+    def show_word_when_ready(self, future: Future, difficulty: str):
+        self.pending_id = None
+        if not future.done():
+            # keep it for this difficulty in case the round is abandoned
+            self.prefetched[difficulty] = future
+            self.pending_id = self.root.after(20, self.take_pending, difficulty)
+            return
+
         try:
-            chosen, scrambled, order = self.logic.next_word(difficulty)
+            chosen, scrambled, order = future.result()
         except RuntimeError as e:
             # No more words in this difficulty
             messagebox.showinfo(
@@ -240,10 +351,16 @@ class WordScrambleGUI:
             messagebox.showerror("Error", f"Could not pick next word: {e}")
             return
 
+        with self.logic_lock:
+            self.logic.record_round(difficulty, chosen)
         self.chosen_word = chosen
         self.scrambled_word = scrambled
+        self.round_hints = RoundHints(chosen, order)
 
         self.scrambled_label.config(text=self.scrambled_word)
+        self.entry.config(state="normal")
+        self.btn_guess.config(state="normal")
+        self.round_active = True
         self.entry.delete(0, tk.END)
         self.entry.focus_set()
 
@@ -251,17 +368,33 @@ class WordScrambleGUI:
         self.update_remaining_label()
 
         # setup timer
-        self.timer_seconds = self.difficulty_to_seconds(difficulty)
+        self.round_timer = RoundTimer(self.difficulty_to_seconds(difficulty))
+        self.timer_seconds = self.round_timer.display_seconds()
         self.update_timer_label()
-        self.round_start_time = time.time()
         self.countdown()
 
+        # prepare the following word while this round is played
+        self.prefetch(difficulty)
+
+    def take_pending(self, difficulty: str):
+        self.show_word_when_ready(self.prefetched.pop(difficulty), difficulty)
+
+    def cancel_pending(self):
+        if self.pending_id:
+            self.root.after_cancel(self.pending_id)
+            self.pending_id = None
+
     def update_attempts_label(self):
         self.attempts_label.config(text=f"Attempts: {self.attempts}")
 
     def check_guess(self):
         if not self.round_active:
             return
+        if self.round_timer.expired():
+            # the countdown callback may not have run yet; a late guess never counts
+            self.result_label.config(text=f"Time's up! The word was: {self.chosen_word}", fg=self.bad)
+            self.reveal_and_end("time")
+            return
 
         guess = self.entry.get().upper().strip()
         if not guess:
@@ -271,11 +404,17 @@ class WordScrambleGUI:
         self.attempts += 1
         self.update_attempts_label()
 
-        if guess == self.chosen_word:
-            time_used = int(time.time() - (self.round_start_time or time.time()))
-            self.result_label.config(text=f"Correct! You solved it in {self.attempts} attempts.", fg=self.good)
+        with self.logic_lock:
+            correct = self.logic.is_correct_guess(guess, self.chosen_word)
+        if correct:
+            time_used = self.round_timer.elapsed()
+            also = "" if guess == self.chosen_word else f" (we had {self.chosen_word} in mind)"
+            self.result_label.config(
+                text=f"Correct! You solved it in {self.attempts} attempts ({time_used:.1f}s).{also}", fg=self.good
+            )
             # update logic scoreboard
-            self.logic.record_win(self.attempts, time_used)
+            with self.logic_lock:
+                self.logic.record_win(self.attempts, time_used)
             self.round_won()
         else:
             self.result_label.config(text="Wrong…", fg=self.bad)
@@ -283,6 +422,14 @@ class WordScrambleGUI:
         # clear entry after guess
         self.entry.delete(0, tk.END)
 
+    def show_hint(self):
+        if not self.round_active:
+            return
+        if self.round_hints.next_hint() is None:
+            self.result_label.config(text="No more hints — every letter is shown.", fg=self.neutral)
+            return
+        self.result_label.config(text=f"Hint: {self.round_hints.pattern()}", fg=self.neutral)
+
     def solve_word(self):
         if not self.round_active:
             return
@@ -297,6 +444,8 @@ class WordScrambleGUI:
         self.entry.delete(0, tk.END)
         self.entry.config(state="disabled")
         self.btn_guess.config(state="disabled")
+        with self.logic_lock:
+            self.logic.record_loss("timeout" if reason == "time" else "revealed")
 
         if reason == "time":
             messagebox.showinfo("Time's up", f"Time's up! The word was: {self.chosen_word}")
@@ -319,7 +468,7 @@ class WordScrambleGUI:
     def show_scoreboard(self):
         sb = tk.Toplevel(self.root)
         sb.title("Scoreboard / Highscores")
-        sb.geometry("320x260")
+        sb.geometry("320x420")
         sb.resizable(False, False)
         sb.configure(bg=self.bg_color)
 
@@ -331,9 +480,22 @@ class WordScrambleGUI:
         ba = "—" if self.logic.best_attempts is None else f"{self.logic.best_attempts} attempts"
         tk.Label(sb, text=f"Best attempts: {ba}", font=("Segoe UI", 12), bg=self.bg_color, fg=self.neutral).pack(pady=2)
 
-        bt = "—" if self.logic.best_time is None else f"{self.logic.best_time} seconds"
+        bt = "—" if self.logic.best_time is None else f"{self.logic.best_time:.1f} seconds"
         tk.Label(sb, text=f"Best time:     {bt}", font=("Segoe UI", 12), bg=self.bg_color, fg=self.neutral).pack(pady=2)
 
+        leaderboard = self.logic.leaderboard
+        if leaderboard is not None:
+            diff = self.difficulty_var.get()
+            tk.Label(sb, text=f"Fastest — {diff}", font=("Segoe UI", 13, "bold"), bg=self.bg_color, fg=self.primary).pack(pady=(10, 2))
+            top = leaderboard.top(diff, "time", 5)
+            for place, (secs, player) in enumerate(top, start=1):
+                tk.Label(sb, text=f"{place}. {player}  {secs:.1f}s", font=("Segoe UI", 11), bg=self.bg_color, fg=self.neutral).pack()
+            if not top:
+                tk.Label(sb, text="No wins yet", font=("Segoe UI", 11), bg=self.bg_color, fg=self.neutral).pack()
+            rank = leaderboard.rank_of(self.logic.player, diff, "time")
+            if rank is not None:
+                tk.Label(sb, text=f"Your rank: {rank} of {leaderboard.size(diff)}", font=("Segoe UI", 11), bg=self.bg_color, fg=self.neutral).pack(pady=(4, 0))
+
         tk.Button(sb, text="Close", command=sb.destroy, bg="#736969").pack(pady=12)
 
     # -------------------------
@@ -344,27 +506,57 @@ class WordScrambleGUI:
         self.timer_label.config(text=f"{mins:02d}:{secs:02d}")
 
     def countdown(self):
-        self.update_timer_label()
-        if self.timer_seconds <= 0:
+        # redraw only when the shown second changes, then sleep until it will
+        shown = self.round_timer.display_seconds()
+        if shown != self.timer_seconds:
+            self.timer_seconds = shown
+            self.update_timer_label()
+        if self.round_timer.expired():
             self.result_label.config(text=f"Time's up! The word was: {self.chosen_word}", fg=self.bad)
             self.reveal_and_end("time")
             return
-        self.timer_seconds -= 1
-        self.timer_id = self.root.after(1000, self.countdown)
+        self.timer_id = self.root.after(self.round_timer.ms_until_display_change(), self.countdown)
 
     # -------------------------
     # Navigation
     # -------------------------
     def back_to_start(self):
+        self.cancel_pending()
         if self.timer_id:
             self.root.after_cancel(self.timer_id)
             self.timer_id = None
         self.show_start_screen()
 
+    def close(self):
+        self.cancel_pending()
+        self.worker.shutdown(wait=False, cancel_futures=True)
+        self.watcher.close()
+        if self.logic.score_store is not None:
+            self.logic.score_store.close()
+        if self.logic.metrics is not None and self.metrics_file:
+            self.logic.metrics.write(self.metrics_file)
+        self.root.destroy()
+
 
 def main():
     root = tk.Tk()
-    app = WordScrambleGUI(root)
+    # scoreboard history is kept per OS user in ./scores
+    store = ScoreStore(resolve_path("scores"))
+    leaderboard = Leaderboard()
+    leaderboard.load(store)
+    # WORD_SCRAMBLE_METRICS=path turns on instrumentation, written to path on exit
+    metrics_file = os.environ.get("WORD_SCRAMBLE_METRICS")
+    # themed lists in ./word_lists, next to the built-in food list
+    categories = CategoryRegistry("word_lists", extra={"food": "word_list.txt"})
+    app = WordScrambleGUI(
+        root,
+        player=getpass.getuser(),
+        score_store=store,
+        leaderboard=leaderboard,
+        metrics=Metrics() if metrics_file else None,
+        metrics_file=metrics_file,
+        categories=categories,
+    )
     root.mainloop()
 
 
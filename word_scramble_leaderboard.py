@@ -0,0 +1,168 @@
+"""
+Leaderboards: per-difficulty rankings by best time and by fewest attempts.
+
+Each ranking is an indexable skiplist keyed by (score, player), so adding
+or improving a player's score, looking up a player's rank and reading the
+top N all take O(log n) (plus N for the top-N entries).
+"""
+import random
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from word_scramble_scores import ScoreStore
+
+Entry = Tuple[float, str]  # (score, player); lower scores rank higher
+
+METRICS = ("time", "attempts")
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key: Optional[Entry], levels: int):
+        self.key = key
+        self.next: List[Optional["_Node"]] = [None] * levels
+        self.width = [1] * levels  # entries skipped by next[i]
+
+
+class RankedSkipList:
+    """Sorted set of (score, player) with O(log n) rank queries."""
+
+    MAX_LEVELS = 32
+
+    def __init__(self, seed: Optional[int] = None):
+        self.head = _Node(None, self.MAX_LEVELS)
+        self.size = 0
+        self._rng = random.Random(seed)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _random_levels(self) -> int:
+        levels = 1
+        while levels < self.MAX_LEVELS and self._rng.random() < 0.5:
+            levels += 1
+        return levels
+
+    def _path(self, key: Entry) -> Tuple[List[_Node], List[int]]:
+        """Last node before key on each level, and its 0-based rank (head = -1)."""
+        update = [self.head] * self.MAX_LEVELS
+        ranks = [-1] * self.MAX_LEVELS
+        node, rank = self.head, -1
+        for level in reversed(range(self.MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].key < key:
+                rank += node.width[level]
+                node = node.next[level]
+            update[level] = node
+            ranks[level] = rank
+        return update, ranks
+
+    def insert(self, key: Entry) -> None:
+        update, ranks = self._path(key)
+        levels = self._random_levels()
+        new = _Node(key, levels)
+        rank = ranks[0] + 1  # position of the new node
+        for level in range(self.MAX_LEVELS):
+            prev = update[level]
+            if level < levels:
+                new.next[level] = prev.next[level]
+                prev.next[level] = new
+                skipped = rank - ranks[level]
+                new.width[level] = prev.width[level] - skipped + 1
+                prev.width[level] = skipped
+            else:
+                prev.width[level] += 1
+        self.size += 1
+
+    def remove(self, key: Entry) -> None:
+        update, _ = self._path(key)
+        target = update[0].next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+        for level in range(self.MAX_LEVELS):
+            prev = update[level]
+            if prev.next[level] is target:
+                prev.width[level] += target.width[level] - 1
+                prev.next[level] = target.next[level]
+            else:
+                prev.width[level] -= 1
+        self.size -= 1
+
+    def rank(self, key: Entry) -> int:
+        """0-based position of key (which must be present)."""
+        update, ranks = self._path(key)
+        if update[0].next[0] is None or update[0].next[0].key != key:
+            raise KeyError(key)
+        return ranks[0] + 1
+
+    def first(self, n: int) -> List[Entry]:
+        out: List[Entry] = []
+        node = self.head.next[0]
+        while node is not None and len(out) < n:
+            out.append(node.key)
+            node = node.next[0]
+        return out
+
+
+class Leaderboard:
+    """
+    Rankings across all players, one RankedSkipList per (difficulty, metric).
+    Only each player's best score is ranked. Thread-safe.
+    """
+
+    def __init__(self):
+        self._boards: Dict[Tuple[str, str], RankedSkipList] = {}
+        self._best: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _update(self, difficulty: str, metric: str, player: str, score: float) -> None:
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+        key = (difficulty, metric)
+        board = self._boards.get(key)
+        if board is None:
+            board = self._boards[key] = RankedSkipList()
+            self._best[key] = {}
+        best = self._best[key]
+        old = best.get(player)
+        if old is not None:
+            if old <= score:
+                return
+            board.remove((old, player))
+        board.insert((score, player))
+        best[player] = score
+
+    def record_win(self, player: str, difficulty: str, attempts: int, time_used_seconds: float) -> None:
+        with self._lock:
+            self._update(difficulty, "time", player, time_used_seconds)
+            self._update(difficulty, "attempts", player, attempts)
+
+    def load(self, store: ScoreStore) -> None:
+        """Rank every player's saved per-difficulty bests from a ScoreStore."""
+        bests = store.all_bests()
+        with self._lock:
+            for player, by_difficulty in bests:
+                for difficulty, (attempts, time_used) in by_difficulty.items():
+                    self._update(difficulty, "time", player, time_used)
+                    self._update(difficulty, "attempts", player, attempts)
+
+    def top(self, difficulty: str, metric: str = "time", n: int = 10) -> List[Entry]:
+        """Best n (score, player) pairs, best first."""
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+        with self._lock:
+            board = self._boards.get((difficulty, metric))
+            return board.first(n) if board is not None else []
+
+    def rank_of(self, player: str, difficulty: str, metric: str = "time") -> Optional[int]:
+        """1-based rank of player's best score, or None if unranked."""
+        with self._lock:
+            score = self._best.get((difficulty, metric), {}).get(player)
+            if score is None:
+                return None
+            return self._boards[(difficulty, metric)].rank((score, player)) + 1
+
+    def size(self, difficulty: str, metric: str = "time") -> int:
+        with self._lock:
+            board = self._boards.get((difficulty, metric))
+            return len(board) if board is not None else 0
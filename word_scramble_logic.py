@@ -1,22 +1,168 @@
+import math
 import os
 import random
-from typing import Dict, List, Optional, Tuple
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import (
+    Any,
+    Container,
+    Dict,
+    Iterable,
+    List,
+    MutableSequence,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+    Union,
+)
 
+try:
+    import numpy as np
+except ImportError:  # optional: speeds up make_scrambled_batch and indexing mapped lists
+    np = None
 
-def load_words_from_file(file_name: str) -> List[str]:
+from word_scramble_adaptive import WeightedDraw, WordStats
+from word_scramble_difficulty import (
+    LENGTH_RANGES,
+    DifficultyModel,
+    ScoreRanges,
+    get_model,
+    has_default_settings,
+)
+from word_scramble_leaderboard import Leaderboard
+from word_scramble_metrics import ROUND_BUCKETS, Metrics
+from word_scramble_scores import ScoreStore
+from word_scramble_wordlist import (
+    BloomFilter,
+    CompiledWordList,
+    MappedWordList,
+    file_stamp,
+    is_compiled,
+    resolve_path,
+)
+
+
+# Round time budget per difficulty, in seconds.
+DIFFICULTY_SECONDS: Dict[str, int] = {"Easy": 75, "Medium": 50, "Hard": 30}
+
+
+def difficulty_to_seconds(difficulty: str) -> int:
+    return DIFFICULTY_SECONDS.get(difficulty, 50)
+
+
+def load_words_from_file(file_name: str, use_mmap: bool = False) -> Sequence[str]:
     """
     Load words from a file located next to this module.
     Returns list of uppercase words (stripped).
+    With use_mmap=True the file is memory-mapped instead and a MappedWordList
+    is returned, which decodes words on access.
+    Compiled word lists (see word_scramble_wordlist.compile_word_list) are
+    detected by their header and loaded as a CompiledWordList.
     """
-    base = os.path.dirname(os.path.abspath(__file__))
-    path = os.path.join(base, file_name)
-    with open(path, "r", encoding="utf-8") as f:
+    if is_compiled(file_name):
+        return CompiledWordList(file_name, use_mmap)
+    if use_mmap:
+        return MappedWordList(file_name)
+    with open(resolve_path(file_name), "r", encoding="utf-8") as f:
         return [line.strip().upper() for line in f if line.strip()]
 
 
-def scramble_order(length: int) -> List[int]:
+def word_lengths(words: Sequence[str]) -> Iterable[int]:
+    if isinstance(words, MappedWordList):
+        return words.lengths()
+    return (len(w) for w in words)
+
+
+_MASK64 = (1 << 64) - 1
+_GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+
+
+class CounterRNG:
+    """
+    Counter-based generator (SplitMix64): output n is a pure function of
+    (seed, n), so the state is two integers, a stream can be rewound or
+    jumped by setting counter, and generators never share state.
+    Provides the subset of the random.Random API this module uses.
+    This is the compact, replayable option, not the fast one: being pure
+    Python it is several times slower per call than random.Random (about
+    7x for randrange), so use it when per-session memory or rewinding a
+    stream matters more than draw speed.
+    """
+
+    __slots__ = ("_seed", "counter")
+
+    def __init__(self, seed: Optional[int] = None):
+        self.seed(seed)
+
+    def seed(self, seed: Optional[int] = None) -> None:
+        if seed is None:
+            seed = int.from_bytes(os.urandom(8), "little")
+        self._seed = seed & _MASK64
+        self.counter = 0
+
+    def _next64(self) -> int:
+        self.counter += 1
+        z = (self._seed + self.counter * _GOLDEN_GAMMA) & _MASK64
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+        return z ^ (z >> 31)
+
+    def getrandbits(self, k: int) -> int:
+        bits, filled = 0, 0
+        while filled < k:
+            bits |= self._next64() << filled
+            filled += 64
+        return bits & ((1 << k) - 1)
+
+    def random(self) -> float:
+        return (self._next64() >> 11) * (1.0 / (1 << 53))
+
+    def randrange(self, start: int, stop: Optional[int] = None) -> int:
+        if stop is None:
+            start, stop = 0, start
+        n = stop - start
+        if n <= 0:
+            raise ValueError("empty range for randrange()")
+        k = n.bit_length()
+        r = self.getrandbits(k)
+        while r >= n:
+            r = self.getrandbits(k)
+        return start + r
+
+    def shuffle(self, x: MutableSequence[Any]) -> None:
+        for i in reversed(range(1, len(x))):
+            j = self.randrange(i + 1)
+            x[i], x[j] = x[j], x[i]
+
+    def getstate(self) -> Tuple[int, int]:
+        return self._seed, self.counter
+
+    def setstate(self, state: Tuple[int, int]) -> None:
+        self._seed, self.counter = state
+
+
+RNG = Union[random.Random, CounterRNG]
+
+
+def make_rng(seed: Optional[int] = None, kind: str = "mt") -> RNG:
+    """
+    Build a private generator: "mt" is random.Random (Mersenne Twister, the
+    fastest here), "counter" is the compact, replayable CounterRNG.
+    """
+    if kind == "mt":
+        return random.Random(seed)
+    if kind == "counter":
+        return CounterRNG(seed)
+    raise ValueError(f"Unknown rng kind: {kind}")
+
+
+def scramble_order(length: int, rng: Optional[RNG] = None) -> List[int]:
     order = list(range(length))
-    random.shuffle(order)
+    (rng or random).shuffle(order)
     return order
 
 
@@ -24,84 +170,729 @@ def scramble_word(chosen_word: str, order: List[int]) -> str:
     return "".join(chosen_word[i] for i in order)
 
 
-def make_scrambled(chosen_word: str) -> Tuple[str, List[int]]:
+def make_scrambled(
+    chosen_word: str,
+    rng: Optional[RNG] = None,
+    reject: Optional[Container[str]] = None,
+    metrics: Optional[Metrics] = None,
+) -> Tuple[str, List[int]]:
+    """
+    Returns (scrambled, order) with scrambled != chosen_word whenever the
+    letters allow it. rng defaults to the global random module.
+    Scrambles found in reject (e.g. the dictionary) are retried as well, so
+    the player is never shown another real word; if every try is one, the
+    first that differs from chosen_word is used. Retries are counted in
+    metrics, if given.
+    """
     if len(chosen_word) <= 1:
         return chosen_word, list(range(len(chosen_word)))
-    for _ in range(20):
-        order = scramble_order(len(chosen_word))
+    fallback: Optional[Tuple[str, List[int]]] = None
+    for attempt in range(20):
+        order = scramble_order(len(chosen_word), rng)
         scrambled = scramble_word(chosen_word, order)
         if scrambled != chosen_word:
-            return scrambled, order
-    order = scramble_order(len(chosen_word))
+            if reject is None or scrambled not in reject:
+                if attempt and metrics is not None:
+                    metrics.inc("scramble_retries_total", attempt)
+                return scrambled, order
+            if fallback is None:
+                fallback = scrambled, order
+    if metrics is not None:
+        metrics.inc("scramble_retries_total", 20)
+    if fallback is not None:
+        return fallback
+    order = scramble_order(len(chosen_word), rng)
     return scramble_word(chosen_word, order), order
 
 
+def make_scrambled_batch(
+    words: Sequence[str], rng: Optional[RNG] = None
+) -> List[Tuple[str, List[int]]]:
+    """
+    make_scrambled for many words at once; returns (scrambled, order) per word.
+    With NumPy installed, words are grouped by length, packed into one
+    code-point matrix per length and permuted together (argsort of random
+    keys). Rows that came out unchanged are redrawn as a batch, except words
+    whose letters are all the same, which can never differ. Without NumPy
+    this falls back to calling make_scrambled per word.
+    """
+    if np is None:
+        return [make_scrambled(w, rng) for w in words]
+
+    np_rng = np.random.default_rng((rng or random).getrandbits(64))
+    results: List[Tuple[str, List[int]]] = [("", [])] * len(words)
+    by_length: Dict[int, List[int]] = {}
+    for i, w in enumerate(words):
+        by_length.setdefault(len(w), []).append(i)
+
+    for length, positions in by_length.items():
+        if length <= 1:
+            for i in positions:
+                results[i] = (words[i], list(range(length)))
+            continue
+
+        codes = np.array([words[i] for i in positions], dtype=f"U{length}")
+        codes = codes.view(np.uint32).reshape(-1, length)
+        orders = np_rng.random(codes.shape).argsort(axis=1)
+        scrambled = np.take_along_axis(codes, orders, axis=1)
+
+        can_differ = ~(codes == codes[:, :1]).all(axis=1)
+        redo = (scrambled == codes).all(axis=1) & can_differ
+        while redo.any():
+            rows = np.flatnonzero(redo)
+            orders[rows] = np_rng.random((len(rows), length)).argsort(axis=1)
+            scrambled[rows] = np.take_along_axis(codes[rows], orders[rows], axis=1)
+            redo[rows] = (scrambled[rows] == codes[rows]).all(axis=1)
+
+        texts = np.ascontiguousarray(scrambled).view(f"U{length}").ravel().tolist()
+        for i, text, order in zip(positions, texts, orders.tolist()):
+            results[i] = (text, order)
+    return results
+
+
+class RoundTimer:
+    """
+    Round countdown driven by a time.monotonic() deadline.
+    Remaining time is always computed from the deadline, so late or missed
+    UI callbacks never stretch a round, and wall-clock jumps do not matter.
+    """
+
+    __slots__ = ("started", "deadline", "clock")
+
+    def __init__(self, seconds: float, clock=time.monotonic):
+        self.clock = clock
+        self.started = clock()
+        self.deadline = self.started + seconds
+
+    def elapsed(self) -> float:
+        return self.clock() - self.started
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - self.clock())
+
+    def expired(self) -> bool:
+        return self.clock() >= self.deadline
+
+    def display_seconds(self) -> int:
+        """Whole seconds to show: rounded up, so 0 appears only at expiry."""
+        return math.ceil(self.remaining())
+
+    def ms_until_display_change(self) -> int:
+        """Milliseconds until display_seconds() next changes (at least 1)."""
+        remaining = self.remaining()
+        step = remaining - (math.ceil(remaining) - 1)
+        return max(1, math.ceil(step * 1000))
+
+
+class RoundHints:
+    """
+    Progressive hints for one round: each hint reveals the next answer
+    position (left to right) that is still hidden.
+    - revealed positions are a bitmask, so a hint is O(1)
+    - tile_of[p] is the index in the scrambled word holding answer letter p
+      (the inverse of the scramble order), computed once when built
+    """
+
+    __slots__ = ("word", "tile_of", "mask")
+
+    def __init__(self, word: str, order: Sequence[int]):
+        self.word = word
+        tile_of = [0] * len(order)
+        for tile, pos in enumerate(order):
+            tile_of[pos] = tile
+        self.tile_of = tile_of
+        self.mask = 0
+
+    def next_hint(self) -> Optional[Tuple[int, str, int]]:
+        """(position, letter, scrambled tile) of the next hidden letter, or None."""
+        pos = ((~self.mask) & (self.mask + 1)).bit_length() - 1
+        if pos >= len(self.word):
+            return None
+        self.mask |= 1 << pos
+        return pos, self.word[pos], self.tile_of[pos]
+
+    def revealed(self) -> int:
+        return bin(self.mask).count("1")
+
+    def pattern(self, hidden: str = "_") -> str:
+        """The answer with unrevealed letters replaced, e.g. "BA____"."""
+        return "".join(
+            ch if self.mask >> i & 1 else hidden for i, ch in enumerate(self.word)
+        )
+
+
+class ScrambleProvider(Protocol):
+    """Anything that can hand out scrambles in place of make_scrambled."""
+
+    def get(self, word: str, rng: Optional[RNG] = None) -> Tuple[str, List[int]]: ...
+
+
+class WordIndex:
+    """
+    Load-time index of a word list grouped by difficulty score.
+    - ids holds positions into the word list, ordered by score (stable)
+    - each difficulty is a score range, so it resolves to one contiguous
+      (start, stop) slice of ids
+    Without a difficulty model the score is the word length: ids are built
+    with a counting sort, so construction is O(n), and words of length L
+    live in ids[length_starts[L]:length_starts[L + 1]]. With a model
+    (see word_scramble_difficulty) every word is scored once and ids are
+    sorted by score; scores then holds the score of each entry of ids.
+    Compiled lists carry both orders precomputed. Lookups are O(1).
+    Duplicate words in in-memory lists are indexed once. Compiled lists are
+    de-duplicated when compiled; memory-mapped text lists are taken as-is.
+    """
+
+    def __init__(self, words: Sequence[str], model: Optional[DifficultyModel] = None):
+        self.model_name = "length" if model is None else model.name
+        self.scores: Optional[Sequence[float]] = None
+        self._positions: Optional[array] = None  # inverse of ids, see position_of
+        if isinstance(words, CompiledWordList):
+            stored = words.score_order is not None
+            if stored and (model is None or model.name == words.score_model and has_default_settings(model)):
+                # scored when compiled, with the model's default settings
+                self.model_name = words.score_model
+                ranges = get_model(words.score_model).ranges if model is None else model.ranges
+                self._set_scored(words.score_order, words.scores, ranges)
+            elif model is None:
+                # already stored in length order
+                self._set_buckets(range(len(words)), words.length_starts)
+            else:
+                self._score(words, range(len(words)), model)
+            return
+
+        lengths = word_lengths(words)
+        if np is not None and isinstance(lengths, np.ndarray) and model is None:
+            # ASCII memory-mapped list: a stable sort by length keeps file order within a length
+            ids = array("I")
+            ids.frombytes(np.argsort(lengths, kind="stable").astype(np.uint32).tobytes())
+            counts = np.bincount(lengths.astype(np.intp)) if len(lengths) else np.zeros(1, np.intp)
+            self._set_buckets(ids, [0] + np.cumsum(counts).tolist())
+            return
+
+        lengths = list(lengths)
+        if isinstance(words, list):
+            seen = set()
+            for i, w in enumerate(words):
+                if w in seen:
+                    lengths[i] = -1  # skipped below
+                else:
+                    seen.add(w)
+            del seen
+        if model is not None:
+            self._score(words, [i for i, length in enumerate(lengths) if length >= 0], model)
+            return
+        max_len = max(lengths, default=0)
+
+        # counts[L + 1] = number of words of length L, then prefix-summed
+        starts = [0] * (max_len + 2)
+        for length in lengths:
+            if length >= 0:
+                starts[length + 1] += 1
+        for length in range(1, len(starts)):
+            starts[length] += starts[length - 1]
+
+        ids = array("I", [0]) * starts[-1]
+        fill = starts[:-1]
+        for i, length in enumerate(lengths):
+            if length < 0:
+                continue
+            ids[fill[length]] = i
+            fill[length] += 1
+
+        self._set_buckets(ids, starts)
+
+    def _set_buckets(self, ids: Sequence[int], starts: List[int]) -> None:
+        self.ids = ids
+        self.length_starts: Optional[List[int]] = starts
+        last = len(starts) - 1
+        # a length range [lo, hi) starts where its first length does
+        self.spans: Dict[str, Tuple[int, int]] = {
+            d: (starts[min(int(lo), last)], starts[last if hi is None else min(int(hi), last)])
+            for d, (lo, hi) in LENGTH_RANGES.items()
+        }
+
+    def _score(self, words: Sequence[str], candidates: Iterable[int], model: DifficultyModel) -> None:
+        scores = model.score_words(words)
+        ids = array("I", sorted(candidates, key=scores.__getitem__))
+        self._set_scored(ids, array("f", (scores[i] for i in ids)), model.ranges)
+
+    def _set_scored(self, ids: Sequence[int], scores: Sequence[float], ranges: ScoreRanges) -> None:
+        self.ids = ids
+        self.scores = scores
+        self.length_starts = None
+        self.spans = {
+            d: (bisect_left(scores, lo), len(scores) if hi is None else bisect_left(scores, hi))
+            for d, (lo, hi) in ranges.items()
+        }
+
+    def positions(self) -> array:
+        """Inverse of ids: positions()[word_id] is its index in ids, or -1. Built on first use."""
+        if self._positions is None:
+            positions = array("i", [-1]) * (max(self.ids, default=-1) + 1)
+            for pos, i in enumerate(self.ids):
+                positions[i] = pos
+            self._positions = positions
+        return self._positions
+
+    def position_of(self, word_id: int) -> int:
+        positions = self.positions()
+        return positions[word_id] if word_id < len(positions) else -1
+
+    def difficulty_at(self, position: int) -> Optional[str]:
+        """Difficulty whose slice of ids holds position, if any."""
+        for d, (start, stop) in self.spans.items():
+            if start <= position < stop:
+                return d
+        return None
+
+    def span(self, difficulty: str) -> Tuple[int, int]:
+        """(start, stop) slice of ids for a difficulty. Unknown names map to Hard."""
+        return self.spans.get(difficulty, self.spans["Hard"])
+
+    def word_ids(self, difficulty: str) -> Sequence[int]:
+        start, stop = self.span(difficulty)
+        return self.ids[start:stop]
+
+    def count(self, difficulty: str) -> int:
+        start, stop = self.span(difficulty)
+        return stop - start
+
+
+class WordDraw:
+    """
+    Draws positions from one difficulty bucket without repeats.
+    Partial Fisher–Yates: a random remaining position is swapped to the end
+    of the unused region and the cursor (remaining) moves down by one, so
+    drawing, exhaustion checks and counts are O(1). Positions are offsets into
+    the bucket's slice of WordIndex.ids; drawn ones sit at [remaining, size).
+
+    The permutation is lazy: it starts as the identity and only swapped
+    entries are stored, in a dict. Creating a WordDraw is O(1) whatever the
+    bucket size; once enough entries have been swapped that a dense array is
+    smaller, the dict is converted to one.
+    """
+
+    __slots__ = ("size", "perm", "remaining")
+
+    # dict entries cost roughly this many array slots
+    _DENSE_RATIO = 16
+
+    def __init__(self, size: int):
+        self.size = size
+        self.perm: Union[Dict[int, int], array] = {}
+        self.remaining = size
+
+    def draw(self, rng: Optional[RNG] = None) -> int:
+        return self.take(self.pick(rng))
+
+    def pick(self, rng: Optional[RNG] = None) -> int:
+        """A random unused slot; nothing is drawn until take(slot)."""
+        if not self.remaining:
+            raise IndexError("bucket exhausted")
+        return (rng or random).randrange(self.remaining)
+
+    def peek(self, j: int) -> int:
+        """Position held by unused slot j."""
+        perm = self.perm
+        return perm.get(j, j) if isinstance(perm, dict) else perm[j]
+
+    def take(self, j: int) -> int:
+        """Draw the position in unused slot j."""
+        last = self.remaining - 1
+        perm = self.perm
+        if isinstance(perm, dict):
+            picked = perm.get(j, j)
+            if j != last:
+                perm[j] = perm.get(last, last)
+            perm[last] = picked
+            if len(perm) * self._DENSE_RATIO > self.size:
+                self._densify()
+        else:
+            picked = perm[j]
+            perm[j], perm[last] = perm[last], picked
+        self.remaining = last
+        return picked
+
+    def exclude(self, positions: Iterable[int]) -> None:
+        """
+        Draw the given unused positions, e.g. to carry a run over. Raises
+        ValueError for a position already drawn, including one given twice.
+        """
+        # position -> slot for every position not in its own slot (the
+        # inverse of perm), kept up to date as positions move below
+        perm = self.perm
+        if isinstance(perm, dict):
+            where = {pos: slot for slot, pos in perm.items()}
+        else:
+            where = {pos: slot for slot, pos in enumerate(perm) if pos != slot}
+        for pos in positions:
+            slot = where.get(pos, pos)
+            if slot >= self.remaining:
+                raise ValueError(f"position {pos} is already drawn")
+            moved = self.peek(self.remaining - 1)
+            self.take(slot)  # the last unused position moves into slot
+            where[moved] = slot
+            where[pos] = self.remaining  # and pos to the drawn region
+
+    def _densify(self) -> None:
+        dense = array("I", range(self.size))
+        for pos, value in self.perm.items():
+            dense[pos] = value
+        self.perm = dense
+
+    def drawn(self) -> Sequence[int]:
+        perm = self.perm
+        if isinstance(perm, dict):
+            return [perm.get(p, p) for p in range(self.remaining, self.size)]
+        return perm[self.remaining:]
+
+
+def letter_signature(word: str) -> str:
+    """Sorted letters: two words are anagrams iff their signatures match."""
+    return "".join(sorted(word))
+
+
+class WordDictionary:
+    """
+    Immutable word list plus its WordIndex, shared by every session that
+    plays from the same file. Use load_dictionary() to get the cached one.
+    A difficulty model (word_scramble_difficulty) decides the buckets; by
+    default they are word-length ranges, or the model the list was compiled
+    with.
+
+    signatures maps a letter signature to the id of the one word with those
+    letters, or a tuple of ids when there are several (anagrams). It is
+    built at load time for in-memory lists; for compiled and memory-mapped
+    lists it is built on first use so they keep their fast startup.
+
+    stamp identifies the version of the file that was loaded. When a newer
+    version is swapped in (see word_scramble_reload), successor points to
+    it and sessions move over on their next draw.
+    """
+
+    __slots__ = (
+        "word_file",
+        "use_mmap",
+        "model",
+        "stamp",
+        "successor",
+        "words",
+        "index",
+        "_signatures",
+        "_bloom",
+        "_lock",
+    )
+
+    def __init__(self, word_file: str, use_mmap: bool = False, model: Optional[DifficultyModel] = None):
+        # stamped before reading, so an edit made during the load is seen as new
+        self.stamp = file_stamp(word_file)
+        words = load_words_from_file(word_file, use_mmap)
+        self.word_file = word_file
+        self.use_mmap = use_mmap
+        self.model = model
+        self.successor: Optional["WordDictionary"] = None
+        self.words: Sequence[str] = tuple(words) if isinstance(words, list) else words
+        self.index = WordIndex(words, model)
+        self._signatures: Optional[Dict[str, Union[int, Tuple[int, ...]]]] = None
+        self._bloom: Optional[BloomFilter] = None
+        self._lock = threading.Lock()
+        if isinstance(words, list):
+            self._signatures = self._build_signatures()
+
+    def _build_signatures(self) -> Dict[str, Union[int, Tuple[int, ...]]]:
+        signatures: Dict[str, Union[int, Tuple[int, ...]]] = {}
+        words = self.words
+        for i in self.index.ids:
+            word = words[i]
+            sig = letter_signature(word)
+            found = signatures.get(sig)
+            if found is None:
+                signatures[sig] = i
+            elif isinstance(found, int):
+                # mmap text lists are not de-duplicated: keep one id per word
+                if words[found] != word:
+                    signatures[sig] = (found, i)
+            elif all(words[j] != word for j in found):
+                signatures[sig] = found + (i,)
+        return signatures
+
+    @property
+    def signatures(self) -> Dict[str, Union[int, Tuple[int, ...]]]:
+        if self._signatures is None:
+            with self._lock:
+                if self._signatures is None:
+                    self._signatures = self._build_signatures()
+        return self._signatures
+
+    def anagram_ids(self, word: str) -> Tuple[int, ...]:
+        """Ids of all dictionary words made of exactly word's letters."""
+        found = self.signatures.get(letter_signature(word))
+        if found is None:
+            return ()
+        return (found,) if isinstance(found, int) else found
+
+    def approx_bytes(self) -> int:
+        """
+        Rough memory held: the words (or a compiled/mapped list's file, in
+        memory or the page cache), index arrays and signature table.
+        """
+        words = self.words
+        if isinstance(words, tuple):
+            total = sys.getsizeof(words) + sum(sys.getsizeof(w) for w in words)
+        else:
+            total = os.path.getsize(resolve_path(self.word_file))
+        for arr in (self.index.ids, self.index.scores):
+            if isinstance(arr, array):
+                total += arr.itemsize * len(arr)
+        if self._signatures is not None:
+            total += sys.getsizeof(self._signatures) + sum(sys.getsizeof(sig) for sig in self._signatures)
+        return total
+
+    def word_id(self, word: str) -> Optional[int]:
+        """Position of word in words, or None if it is not in the list."""
+        for i in self.anagram_ids(word):
+            if self.words[i] == word:
+                return i
+        return None
+
+    def anagrams(self, word: str) -> List[str]:
+        return [self.words[i] for i in self.anagram_ids(word)]
+
+    def __contains__(self, word: object) -> bool:
+        if not isinstance(word, str):
+            return False
+        return any(self.words[i] == word for i in self.anagram_ids(word))
+
+    @property
+    def scramble_filter(self) -> Container[str]:
+        """
+        Membership test used to keep scrambles from being real words.
+        Exact (the signature index) when that is already built; otherwise a
+        BloomFilter, so compiled and memory-mapped lists stay memory-bounded.
+        A Bloom false positive only costs one extra scramble attempt.
+        """
+        if self._signatures is not None:
+            return self
+        if self._bloom is None:
+            with self._lock:
+                if self._bloom is None:
+                    bloom = BloomFilter(len(self.index.ids))
+                    for i in self.index.ids:
+                        bloom.add(self.words[i])
+                    self._bloom = bloom
+        return self._bloom
+
+
+_dictionaries: Dict[Tuple[str, bool, Optional[DifficultyModel]], WordDictionary] = {}
+_dictionaries_lock = threading.Lock()
+
+
+def load_dictionary(
+    word_file: str, use_mmap: bool = False, model: Optional[DifficultyModel] = None
+) -> WordDictionary:
+    """
+    Return the shared WordDictionary for a file, loading it on first use.
+    Sessions share a dictionary when they pass the same model instance.
+    A file edited since it was loaded is loaded again (one stat per call);
+    sessions already on the old version keep it.
+    """
+    key = (resolve_path(word_file), use_mmap, model)
+    with _dictionaries_lock:
+        dictionary = _dictionaries.get(key)
+        if dictionary is not None:
+            try:
+                stale = file_stamp(word_file) != dictionary.stamp
+            except OSError:
+                stale = False  # gone or mid-replace: keep what we have
+            if not stale:
+                return dictionary
+        dictionary = _dictionaries[key] = WordDictionary(word_file, use_mmap, model)
+        return dictionary
+
+
+def forget_dictionary(dictionary: WordDictionary) -> None:
+    """Drop dictionary from load_dictionary's cache; sessions using it keep it."""
+    with _dictionaries_lock:
+        for key in [k for k, d in _dictionaries.items() if d is dictionary]:
+            del _dictionaries[key]
+
+
+def replace_dictionary(old: WordDictionary, new: WordDictionary) -> None:
+    """
+    Swap new in for old: load_dictionary returns new from now on, and
+    sessions still on old move to new on their next draw.
+    """
+    with _dictionaries_lock:
+        for key, dictionary in _dictionaries.items():
+            if dictionary is old:
+                _dictionaries[key] = new
+        old.successor = new
+
+
 class WordGameLogic:
     """
     Core game logic separated from UI.
     Responsibilities:
     - load and filter words
-    - maintain unused word pools per difficulty
-    - ensure words aren't reused within a run (used_words set)
+    - maintain unused word pools per difficulty (one WordDraw each)
+    - ensure words aren't reused within a run
     - provide next_word() which returns (chosen_word, scrambled, order)
     - track scoreboard (total rounds, rounds won, best attempts, best_time)
+
+    One instance is one player's session: it holds only small integers and
+    draw state, and references a shared WordDictionary for the words.
+
+    Randomness comes from rng: pass one, or a seed (and rng_kind) to make the
+    session reproducible. Without either the global random module is used.
+    A scrambler (e.g. word_scramble_cache.ScrambleCache) replaces
+    make_scrambled in next_word and can be shared by many sessions.
+    With a player name and a score_store (word_scramble_scores.ScoreStore)
+    the scoreboard starts from the player's saved history and every round
+    and win is also recorded in the store. Wins of a named player also feed
+    a shared leaderboard (word_scramble_leaderboard.Leaderboard) if given.
+    avoid_real_words makes next_word retry scrambles that are dictionary words.
+    difficulty_model replaces plain word length when bucketing words into
+    difficulties (ignored when a dictionary is passed in).
+    Results of each round's word go to word_stats
+    (word_scramble_adaptive.WordStats), which sessions can share; with
+    adaptive=True words are drawn weighted towards those whose solve rate
+    is near target_success instead of uniformly.
+    metrics (word_scramble_metrics.Metrics) turns on instrumentation of
+    draws, scrambles, guesses and round results; without it the only cost
+    is an `is None` check.
     """
 
     DIFFICULTIES = ("Easy", "Medium", "Hard")
+    ANAGRAM_CANDIDATES = 8  # words looked at by next_word(anagrams=...)
+    _DIFFICULTY_SLOT = {d: i for i, d in enumerate(DIFFICULTIES)}
 
-    def __init__(self, word_file: str = "word_list.txt"):
-        self.word_file = word_file
-        self.words_all: List[str] = load_words_from_file(word_file)
+    __slots__ = (
+        "dictionary",
+        "rng",
+        "rng_kind",
+        "scrambler",
+        "player",
+        "score_store",
+        "leaderboard",
+        "avoid_real_words",
+        "difficulty",
+        "word",
+        "word_id",
+        "pending",
+        "word_stats",
+        "target_success",
+        "metrics",
+        "draws",
+        "total_rounds",
+        "rounds_won",
+        "best_time",
+        "best_attempts",
+    )
+
+    def __init__(
+        self,
+        word_file: str = "word_list.txt",
+        use_mmap: bool = False,
+        dictionary: Optional[WordDictionary] = None,
+        seed: Optional[int] = None,
+        rng: Optional[RNG] = None,
+        rng_kind: str = "mt",
+        scrambler: Optional[ScrambleProvider] = None,
+        player: Optional[str] = None,
+        score_store: Optional[ScoreStore] = None,
+        leaderboard: Optional[Leaderboard] = None,
+        avoid_real_words: bool = False,
+        difficulty_model: Optional[DifficultyModel] = None,
+        word_stats: Optional[WordStats] = None,
+        adaptive: bool = False,
+        target_success: float = 0.7,
+        metrics: Optional[Metrics] = None,
+    ):
+        self.dictionary = dictionary or load_dictionary(word_file, use_mmap, difficulty_model)
+        if rng_kind not in ("mt", "counter"):
+            raise ValueError(f"Unknown rng kind: {rng_kind}")
+        self.rng_kind = rng_kind  # for generators made on a later reseed
+        if rng is None and seed is not None:
+            rng = make_rng(seed, rng_kind)
+        self.rng: Optional[RNG] = rng
+        self.scrambler = scrambler
+        self.player = player
+        self.score_store = score_store if player is not None else None
+        self.leaderboard = leaderboard if player is not None else None
+        self.avoid_real_words = avoid_real_words
+        self.difficulty: Optional[str] = None  # of the current round
+        self.word: Optional[str] = None  # current round's word, until its result is recorded
+        self.word_id: Optional[int] = None  # its id, if it was drawn by this session
+        # word -> (difficulty, id) for words drawn but not yet counted by
+        # record_round: results are credited without a word -> id lookup
+        # (which a mapped list builds lazily), and remaining_counts still
+        # counts them
+        self.pending: Dict[str, Tuple[str, int]] = {}
+        if adaptive and word_stats is None:
+            word_stats = WordStats(len(self.dictionary.words))
+        self.word_stats = word_stats
+        self.target_success = target_success if adaptive else None
+        self.metrics = metrics
 
-        # Pools and tracking for a run (initialize in start_run())
-        self.unused_by_difficulty: Optional[Dict[str, List[str]]] = None
-        self.used_words: set = set()
+        # Pools and tracking for a run (initialize in start_run()),
+        # one WordDraw (WeightedDraw when adaptive) per entry in DIFFICULTIES
+        self.draws: Optional[Tuple[Union[WordDraw, WeightedDraw], ...]] = None
 
         # Scoreboard
         self.total_rounds = 0
         self.rounds_won = 0
-        self.best_time: Optional[int] = None  # seconds
+        self.best_time: Optional[float] = None  # seconds
         self.best_attempts: Optional[int] = None
 
+        saved = self.score_store.stats(player) if self.score_store is not None else None
+        if saved is not None:
+            self.total_rounds = saved.total_rounds
+            self.rounds_won = saved.rounds_won
+            self.best_time = saved.best_time
+            self.best_attempts = saved.best_attempts
+
+    @property
+    def word_file(self) -> str:
+        return self.dictionary.word_file
+
+    @property
+    def words_all(self) -> Sequence[str]:
+        return self.dictionary.words
+
+    @property
+    def index(self) -> WordIndex:
+        return self.dictionary.index
+
     # -------------------------
     # Difficulty and filtering
     # -------------------------
     def filter_words_by_difficulty(self, difficulty: str) -> List[str]:
-        if difficulty == "Easy":
-            return [w for w in self.words_all if 2 <= len(w) <= 5]
-        elif difficulty == "Medium":
-            return [w for w in self.words_all if 5 < len(w) <= 8]
-        else:  # Hard
-            return [w for w in self.words_all if len(w) > 8]
+        words = self.words_all
+        return [words[i] for i in self.index.word_ids(difficulty)]
 
     # -------------------------
     # Run management
     # -------------------------
-    def start_run(self, reset_scoreboard: bool = False) -> None:
+    def start_run(self, reset_scoreboard: bool = False, seed: Optional[int] = None) -> None:
         """
         Prepare pools for a run. Call before beginning a run.
-        If reset_scoreboard True, scoreboard stats are cleared.
-        """
-        self.unused_by_difficulty = {
-            "Easy": [],
-            "Medium": [],
-            "Hard": []
-}
-
-        for w in self.words_all:
-            L = len(w)
-            if 2 <= L <= 5:
-                self.unused_by_difficulty["Easy"].append(w)
-            elif 6 <= L <= 8:
-                self.unused_by_difficulty["Medium"].append(w)
+        If reset_scoreboard True, scoreboard stats are cleared (history in a
+        score_store is kept).
+        A seed reseeds the session's rng so the run can be replayed.
+        """
+        if seed is not None:
+            if self.rng is None:
+                self.rng = make_rng(seed, self.rng_kind)
             else:
-                self.unused_by_difficulty["Hard"].append(w)
-
-        # shuffle each pool
-        for lst in self.unused_by_difficulty.values():
-            random.shuffle(lst)
+                self.rng.seed(seed)
 
-        self.used_words = set()
+        self.draws = None
+        self.pending.clear()
+        self._follow_reload()
+        self.draws = tuple(self._new_draw(d) for d in self.DIFFICULTIES)
+        if self.metrics is not None:
+            self.metrics.inc("runs_started_total")
 
         if reset_scoreboard:
             self.total_rounds = 0
@@ -109,77 +900,256 @@ class WordGameLogic:
             self.best_time = None
             self.best_attempts = None
 
+    def _follow_reload(self) -> None:
+        """
+        Move to the newest version of a reloaded dictionary, keeping the run:
+        words drawn so far stay drawn if the new list still has them, in
+        whatever difficulty they now belong to. O(words drawn) — the new
+        dictionary's lookups were prepared before it was swapped in.
+        """
+        new = self.dictionary.successor
+        if new is None:
+            return
+        while new.successor is not None:
+            new = new.successor
+        used = self.used_words
+        self.dictionary = new
+        if self.word_stats is not None:
+            while self.word_stats.successor is not None:
+                self.word_stats = self.word_stats.successor
+        # ids drawn before the reload point into the old list
+        if self.word is not None:
+            self.word_id = new.word_id(self.word)
+        index = new.index
+        for word in list(self.pending):
+            word_id = new.word_id(word)
+            difficulty = None if word_id is None else index.difficulty_at(index.position_of(word_id))
+            if difficulty is None:
+                del self.pending[word]
+            else:
+                self.pending[word] = difficulty, word_id
+        if self.draws is None:
+            return
+
+        taken: Dict[str, List[int]] = {d: [] for d in self.DIFFICULTIES}
+        for word in used:
+            word_id = new.word_id(word)
+            if word_id is None:
+                continue  # removed from the list
+            pos = index.position_of(word_id)
+            difficulty = index.difficulty_at(pos)
+            if difficulty in taken:
+                taken[difficulty].append(pos - index.span(difficulty)[0])
+        draws = []
+        for d in self.DIFFICULTIES:
+            draw = self._new_draw(d)
+            draw.exclude(taken[d])
+            draws.append(draw)
+        self.draws = tuple(draws)
+
+    def _new_draw(self, difficulty: str) -> Union[WordDraw, WeightedDraw]:
+        size = self.index.count(difficulty)
+        if self.target_success is None:
+            return WordDraw(size)
+        start, _ = self.index.span(difficulty)
+        return WeightedDraw(size, stats=self.word_stats, index=self.index, target=self.target_success, start=start)
+
+    def switch_dictionary(self, dictionary: WordDictionary) -> None:
+        """
+        Play from another word list (e.g. another category). Starts a new run
+        and keeps the scoreboard. Per-word stats belong to a list, so they
+        start over: a fresh WordStats when adaptive, otherwise none.
+        """
+        if dictionary is self.dictionary:
+            return
+        self.dictionary = dictionary
+        self.word = self.word_id = None
+        self.word_stats = WordStats(len(dictionary.words)) if self.target_success is not None else None
+        self.start_run(reset_scoreboard=False)
+
     def remaining_counts(self) -> Dict[str, int]:
         """
         Returns how many words remain in each difficulty pool (approx).
-        If pools not initialized, returns counts based on filtering.
+        If pools not initialized, returns the index bucket sizes.
+        Words drawn ahead with draw_word count as remaining until
+        record_round counts them.
         """
-        if self.unused_by_difficulty is None:
-            return {
-                d: len(self.filter_words_by_difficulty(d)) for d in self.DIFFICULTIES
-            }
-        else:
-            return {d: len(self.unused_by_difficulty.get(d, [])) for d in self.DIFFICULTIES}
+        if self.draws is None:
+            return {d: self.index.count(d) for d in self.DIFFICULTIES}
+        counts = {d: draw.remaining for d, draw in zip(self.DIFFICULTIES, self.draws)}
+        for difficulty, _ in self.pending.values():
+            counts[difficulty] += 1
+        return counts
+
+    @property
+    def used_words(self) -> set:
+        """Words drawn so far in this run (built on demand)."""
+        if self.draws is None:
+            return set()
+        words, ids = self.words_all, self.index.ids
+        used = set()
+        for d, draw in zip(self.DIFFICULTIES, self.draws):
+            start, _ = self.index.span(d)
+            used.update(words[ids[start + pos]] for pos in draw.drawn())
+        return used
 
     # -------------------------
     # Word selection (no repeats in run)
     # -------------------------
-    def next_word(self, difficulty: str = "Medium") -> Tuple[str, str, List[int]]:
+    def next_word(
+        self,
+        difficulty: str = "Medium",
+        rng: Optional[RNG] = None,
+        anagrams: Optional[str] = None,
+    ) -> Tuple[str, str, List[int]]:
         """
         Returns (chosen_word, scrambled_word, scramble_order).
-        Ensures chosen_word was not already used in this run (unless we've exhausted all).
+        rng overrides the session's generator for this call only.
+        anagrams="avoid" / "prefer" steers the pick away from / towards words
+        that have other dictionary anagrams (best effort, a few candidates).
+        Ensures chosen_word was not already used in this run; raises RuntimeError
+        once the difficulty is exhausted.
         Call start_run() before first next_word().
         """
+        chosen, scrambled, order = self.draw_word(difficulty, rng, anagrams)
+        self.record_round(difficulty, chosen)
+        return chosen, scrambled, order
+
+    def draw_word(
+        self,
+        difficulty: str = "Medium",
+        rng: Optional[RNG] = None,
+        anagrams: Optional[str] = None,
+    ) -> Tuple[str, str, List[int]]:
+        """
+        next_word without counting a round: the word is marked used, but the
+        round only counts once record_round() is called. Lets a caller
+        prepare the next word ahead of time.
+        """
+        self._follow_reload()
+        metrics = self.metrics
+        if metrics is None:
+            return self._draw_word(difficulty, rng, anagrams)
+        start = time.perf_counter()
+        try:
+            result = self._draw_word(difficulty, rng, anagrams)
+        except RuntimeError:
+            metrics.inc("pool_exhausted_total")
+            raise
+        metrics.observe("next_word_seconds", time.perf_counter() - start)
+        metrics.inc("words_drawn_total")
+        return result
+
+    def _draw_word(
+        self,
+        difficulty: str,
+        rng: Optional[RNG],
+        anagrams: Optional[str],
+    ) -> Tuple[str, str, List[int]]:
         if difficulty not in self.DIFFICULTIES:
             raise ValueError("Unknown difficulty")
+        if anagrams not in (None, "avoid", "prefer"):
+            raise ValueError(f"Unknown anagrams mode: {anagrams}")
 
-        if self.unused_by_difficulty is None:
+        if self.draws is None:
             self.start_run(reset_scoreboard=False)
 
-        pool = self.unused_by_difficulty.get(difficulty, [])
-
-        chosen = None
-        while pool:
-            candidate = pool.pop()
-            if candidate not in self.used_words:
-                chosen = candidate
-                break
-
-        if chosen is None:
-            # Refill only from the SAME difficulty and EXCLUDE used words
-            new_pool = [
-                w for w in self.filter_words_by_difficulty(difficulty)
-                if w not in self.used_words
-            ]
-
-            if not new_pool:
-                raise RuntimeError(
-                    f"No more unused words available in difficulty: {difficulty}"
-                )
-
-            random.shuffle(new_pool)
-            self.unused_by_difficulty[difficulty] = new_pool
+        draw = self.draws[self._DIFFICULTY_SLOT[difficulty]]
+        if not draw.remaining:
+            raise RuntimeError(
+                f"No more unused words available in difficulty: {difficulty}"
+            )
+        rng = rng or self.rng
+        start, _ = self.index.span(difficulty)
+        ids, words = self.index.ids, self.words_all
+        if anagrams is None:
+            slot = draw.pick(rng)
+        else:
+            want = anagrams == "prefer"
+            for _ in range(self.ANAGRAM_CANDIDATES):
+                slot = draw.pick(rng)
+                word = words[ids[start + draw.peek(slot)]]
+                if (len(self.dictionary.anagram_ids(word)) > 1) == want:
+                    break
+        word_id = ids[start + draw.take(slot)]
+        chosen = words[word_id]
+        self.pending[chosen] = difficulty, word_id
 
-            chosen = self.unused_by_difficulty[difficulty].pop()
+        reject = self.dictionary.scramble_filter if self.avoid_real_words else None
+        if self.scrambler is None:
+            scrambled, order = make_scrambled(chosen, rng, reject, self.metrics)
+        else:
+            scrambled, order = self.scrambler.get(chosen, rng)
+            if reject is not None and scrambled in reject:
+                scrambled, order = make_scrambled(chosen, rng, reject, self.metrics)
+        return chosen, scrambled, order
 
-        # Mark used immediately
-        self.used_words.add(chosen)
-        self.total_rounds += 1
+    # -------------------------
+    # Guess checking
+    # -------------------------
+    def is_correct_guess(self, guess: str, chosen_word: str) -> bool:
+        """
+        True for chosen_word itself or any other dictionary word using exactly
+        the same letters (e.g. MELON for LEMON).
+        """
+        correct = self._guess_matches(guess.strip().upper(), chosen_word)
+        if self.metrics is not None:
+            self.metrics.inc("guesses_total")
+            if correct:
+                self.metrics.inc("correct_guesses_total")
+        return correct
 
-        scrambled, order = make_scrambled(chosen)
-        return chosen, scrambled, order
+    def _guess_matches(self, guess: str, chosen_word: str) -> bool:
+        if guess == chosen_word:
+            return True
+        if len(guess) != len(chosen_word) or letter_signature(guess) != letter_signature(chosen_word):
+            return False
+        return guess in self.dictionary
 
     # -------------------------
     # Scoreboard recording
     # -------------------------
-    def record_win(self, attempts: int, time_used_seconds: int) -> None:
+    def record_round(self, difficulty: Optional[str] = None, word: Optional[str] = None) -> None:
+        """
+        Count a round; pass its word (as drawn by draw_word) to credit the
+        result to it in word_stats.
+        """
+        self.total_rounds += 1
+        self.difficulty = difficulty
+        self.word = word
+        self.word_id = self.pending.pop(word, (None, None))[1] if word is not None else None
+        if self.score_store is not None:
+            self.score_store.record_round(self.player, difficulty)
+
+    def _record_word_result(self, won: bool, time_used_seconds: float = 0.0) -> None:
+        if self.word_stats is not None and self.word_id is not None:
+            self.word_stats.record(self.word_id, won, time_used_seconds)
+        self.word = self.word_id = None
+
+    def record_loss(self, reason: str = "timeout") -> None:
+        """The round ended unsolved: reason is "timeout" or "revealed"."""
+        if reason not in ("timeout", "revealed"):
+            raise ValueError(f"Unknown loss reason: {reason}")
+        if self.metrics is not None:
+            self.metrics.inc("timeouts_total" if reason == "timeout" else "reveals_total")
+        self._record_word_result(False)
+
+    def record_win(self, attempts: int, time_used_seconds: float) -> None:
         self.rounds_won += 1
         if self.best_attempts is None or attempts < self.best_attempts:
             self.best_attempts = attempts
         if self.best_time is None or time_used_seconds < self.best_time:
             self.best_time = time_used_seconds
+        if self.score_store is not None:
+            self.score_store.record_win(self.player, self.difficulty, attempts, time_used_seconds)
+        if self.leaderboard is not None and self.difficulty is not None:
+            self.leaderboard.record_win(self.player, self.difficulty, attempts, time_used_seconds)
+        if self.metrics is not None:
+            self.metrics.observe("round_won_seconds", time_used_seconds, ROUND_BUCKETS)
+        self._record_word_result(True, time_used_seconds)
 
     # Useful debug repr
     def __repr__(self):
         rem = self.remaining_counts()
-        return f"<WordGameLogic total_words={len(self.words_all)} remaining={rem} used={len(self.used_words)}>"
+        used = 0 if self.draws is None else sum(len(d.drawn()) for d in self.draws)
+        return f"<WordGameLogic total_words={len(self.words_all)} remaining={rem} used={used}>"
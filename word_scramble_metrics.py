@@ -0,0 +1,111 @@
+"""
+Opt-in instrumentation: counters and histograms for the game's hot paths.
+
+Pass a Metrics instance to WordGameLogic (or the GUI / server) to turn it
+on. Without one, instrumented code only pays an `is None` check. Metrics
+can be read as a snapshot dict or as Prometheus text, e.g. written to a
+file for the node_exporter textfile collector.
+"""
+import os
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Sequence
+
+# upper bounds in seconds
+LATENCY_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 5e-3, 0.025, 0.1, 1.0)
+ROUND_BUCKETS = (2.0, 5.0, 10.0, 20.0, 30.0, 50.0, 75.0)
+
+HELP = {
+    "next_word_seconds": "Time to draw and scramble a word",
+    "round_won_seconds": "Time players took to solve a word",
+    "words_drawn_total": "Words drawn",
+    "runs_started_total": "Runs started (fresh word pools)",
+    "pool_exhausted_total": "Draws refused because a difficulty ran out of words",
+    "scramble_retries_total": "Scrambles redrawn because they were the word itself or a real word",
+    "guesses_total": "Guesses checked",
+    "correct_guesses_total": "Guesses that were correct",
+    "timeouts_total": "Rounds that ran out of time",
+    "reveals_total": "Rounds given up with Solve",
+}
+
+
+class Histogram:
+    """Counts of observations per bucket (upper bound), plus their sum."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[int]:
+        out, total = [], 0
+        for n in self.counts:
+            total += n
+            out.append(total)
+        return out
+
+
+class Metrics:
+    """Thread-safe set of named counters and histograms."""
+
+    def __init__(self, prefix: str = "word_scramble_"):
+        self.prefix = prefix
+        self.counters: Dict[str, int] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name: str, value: float, bounds: Sequence[float] = LATENCY_BUCKETS) -> None:
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(bounds)
+            histogram.observe(value)
+
+    def snapshot(self) -> Dict[str, dict]:
+        """{"counters": {name: value}, "histograms": {name: {buckets, sum, count}}}"""
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "histograms": {
+                    name: {
+                        "buckets": dict(zip([*map(str, h.bounds), "+Inf"], h.cumulative())),
+                        "sum": h.sum,
+                        "count": h.count,
+                    }
+                    for name, h in self.histograms.items()
+                },
+            }
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        snap = self.snapshot()
+        lines: List[str] = []
+        for name, value in sorted(snap["counters"].items()):
+            full = self.prefix + name
+            lines += [f"# HELP {full} {HELP.get(name, name)}", f"# TYPE {full} counter", f"{full} {value}"]
+        for name, h in sorted(snap["histograms"].items()):
+            full = self.prefix + name
+            lines += [f"# HELP {full} {HELP.get(name, name)}", f"# TYPE {full} histogram"]
+            lines += [f'{full}_bucket{{le="{le}"}} {n}' for le, n in h["buckets"].items()]
+            lines += [f"{full}_sum {h['sum']}", f"{full}_count {h['count']}"]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Write the Prometheus text to path atomically (write then rename)."""
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+
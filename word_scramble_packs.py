@@ -0,0 +1,254 @@
+"""
+Offline puzzle packs: N puzzles (word, scramble, order, difficulty) per
+difficulty, with no word used twice, written as JSON lines or a compact
+binary file.
+
+Words are picked in this process with the same no-repeat draw as a run of
+WordGameLogic; scrambling is done in chunks on a process pool. Every chunk
+gets its own seed from a stream derived from the pack seed, so a pack is
+the same for a given seed, word list and chunk size however many workers
+made it. Only a few chunks are in flight at a time and finished chunks are
+written out in order, so memory does not grow with the pack.
+
+Run:
+    python word_scramble_packs.py pack.jsonl --count 500 --seed 2024
+    python word_scramble_packs.py pack.wsp --format binary --count 100000 --workers 4
+"""
+import argparse
+import json
+import struct
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import IO, Container, Deque, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from word_scramble_difficulty import DIFFICULTY_MODELS, get_model
+from word_scramble_logic import (
+    CounterRNG,
+    WordDictionary,
+    WordDraw,
+    WordGameLogic,
+    load_dictionary,
+    make_rng,
+    make_scrambled,
+)
+
+# (difficulty, word, scrambled, order)
+Puzzle = Tuple[str, str, str, List[int]]
+
+# Binary pack layout (little-endian):
+#   header   magic, version, difficulty count, puzzle count
+#   names    per difficulty: u8 length + ASCII name
+#   puzzles  u8 difficulty index, u16 word byte length, UTF-8 word,
+#            then one u8 per letter: the scramble order
+# The scramble itself is not stored: it is the word read in that order.
+PACK_MAGIC = b"WSCP"
+PACK_VERSION = 1
+_PACK_HEADER = struct.Struct("<4sHHQ")
+_PUZZLE = struct.Struct("<BH")
+
+# set in each pool worker by _init_worker
+_reject: Optional[Container[str]] = None
+
+
+def _init_worker(word_file: str, use_mmap: bool, avoid_real_words: bool) -> None:
+    global _reject
+    if avoid_real_words:
+        _reject = load_dictionary(word_file, use_mmap).scramble_filter
+
+
+def _scramble_chunk(difficulty: str, words: List[str], seed: int) -> List[Puzzle]:
+    rng = make_rng(seed)
+    puzzles = []
+    for word in words:
+        scrambled, order = make_scrambled(word, rng, _reject)
+        puzzles.append((difficulty, word, scrambled, order))
+    return puzzles
+
+
+def _chunks(
+    dictionary: WordDictionary,
+    count: int,
+    difficulties: Sequence[str],
+    seed: int,
+    chunk_size: int,
+) -> Iterator[Tuple[str, List[str], int]]:
+    """(difficulty, words, chunk seed) in pack order, picked lazily."""
+    rng = make_rng(seed)
+    chunk_seeds = CounterRNG(seed)
+    index, words = dictionary.index, dictionary.words
+    for difficulty in difficulties:
+        start, _ = index.span(difficulty)
+        draw = WordDraw(index.count(difficulty))
+        left = count
+        while left:
+            n = min(left, chunk_size)
+            chunk = [words[index.ids[start + draw.draw(rng)]] for _ in range(n)]
+            yield difficulty, chunk, chunk_seeds.getrandbits(64)
+            left -= n
+
+
+def generate_puzzles(
+    dictionary: WordDictionary,
+    count: int,
+    difficulties: Sequence[str] = WordGameLogic.DIFFICULTIES,
+    seed: int = 0,
+    workers: int = 0,
+    chunk_size: int = 1000,
+    avoid_real_words: bool = False,
+) -> Iterator[Puzzle]:
+    """
+    Yields count puzzles per difficulty, difficulty by difficulty, with no
+    word repeated. workers=0 scrambles in this process; otherwise a pool of
+    that many processes does, with at most two chunks per worker in flight.
+    Raises ValueError (before anything is generated) if a difficulty has
+    fewer than count words.
+    """
+    for difficulty in difficulties:
+        if difficulty not in WordGameLogic.DIFFICULTIES:
+            raise ValueError(f"Unknown difficulty: {difficulty}")
+        if dictionary.index.count(difficulty) < count:
+            raise ValueError(
+                f"Only {dictionary.index.count(difficulty)} {difficulty} words, {count} requested"
+            )
+    chunks = _chunks(dictionary, count, difficulties, seed, max(1, chunk_size))
+    return _scramble_chunks(chunks, dictionary, workers, avoid_real_words)
+
+
+def _scramble_chunks(
+    chunks: Iterator[Tuple[str, List[str], int]],
+    dictionary: WordDictionary,
+    workers: int,
+    avoid_real_words: bool,
+) -> Iterator[Puzzle]:
+    if workers <= 0:
+        reject = dictionary.scramble_filter if avoid_real_words else None
+        for difficulty, words, chunk_seed in chunks:
+            rng = make_rng(chunk_seed)
+            for word in words:
+                scrambled, order = make_scrambled(word, rng, reject)
+                yield difficulty, word, scrambled, order
+        return
+
+    with ProcessPoolExecutor(
+        workers,
+        initializer=_init_worker,
+        initargs=(dictionary.word_file, dictionary.use_mmap, avoid_real_words),
+    ) as pool:
+        pending: Deque["Future[List[Puzzle]]"] = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_scramble_chunk, *chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def write_jsonl(puzzles: Iterable[Puzzle], out: IO[str]) -> int:
+    """One {"difficulty", "word", "scrambled", "order"} object per line; returns the count."""
+    n = 0
+    for difficulty, word, scrambled, order in puzzles:
+        out.write(json.dumps({"difficulty": difficulty, "word": word, "scrambled": scrambled, "order": order}))
+        out.write("\n")
+        n += 1
+    return n
+
+
+def write_binary(
+    puzzles: Iterable[Puzzle],
+    out: IO[bytes],
+    count: int,
+    difficulties: Sequence[str] = WordGameLogic.DIFFICULTIES,
+) -> int:
+    """Binary pack (see the layout above) of exactly count puzzles; returns the count."""
+    out.write(_PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, len(difficulties), count))
+    for name in difficulties:
+        encoded = name.encode("ascii")
+        out.write(bytes((len(encoded),)) + encoded)
+    slot = {name: i for i, name in enumerate(difficulties)}
+    n = 0
+    for difficulty, word, _, order in puzzles:
+        if len(order) > 256:
+            raise ValueError(f"Word too long for a binary pack: {word[:20]}...")
+        encoded = word.encode("utf-8")
+        out.write(_PUZZLE.pack(slot[difficulty], len(encoded)))
+        out.write(encoded)
+        out.write(bytes(order))
+        n += 1
+    if n != count:
+        raise ValueError(f"Wrote {n} puzzles, header says {count}")
+    return n
+
+
+def read_pack(path: str) -> Iterator[Puzzle]:
+    """Puzzles from a pack file in either format, in order."""
+    with open(path, "rb") as f:
+        if f.read(len(PACK_MAGIC)) != PACK_MAGIC:
+            f.seek(0)
+            for line in f:
+                if line.strip():
+                    p = json.loads(line)
+                    yield p["difficulty"], p["word"], p["scrambled"], p["order"]
+            return
+
+        f.seek(0)
+        _, version, name_count, count = _PACK_HEADER.unpack(f.read(_PACK_HEADER.size))
+        if version != PACK_VERSION:
+            raise ValueError(f"{path}: unsupported pack version {version}")
+        names = [f.read(f.read(1)[0]).decode("ascii") for _ in range(name_count)]
+        for _ in range(count):
+            header = f.read(_PUZZLE.size)
+            if len(header) < _PUZZLE.size:
+                raise ValueError(f"{path}: truncated pack")
+            slot, size = _PUZZLE.unpack(header)
+            word = f.read(size).decode("utf-8")
+            order = list(f.read(len(word)))
+            yield names[slot], word, "".join(word[i] for i in order), order
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a puzzle pack")
+    parser.add_argument("output", help="file to write, or - for standard output (JSON lines only)")
+    parser.add_argument("--word-file", default="word_list.txt")
+    parser.add_argument("--count", type=int, default=100, help="puzzles per difficulty")
+    parser.add_argument(
+        "--difficulty", action="append", choices=WordGameLogic.DIFFICULTIES,
+        help="difficulties to include (default: all)",
+    )
+    parser.add_argument("--seed", type=int, help="pack seed; the same seed regenerates the same pack")
+    parser.add_argument("--format", choices=("jsonl", "binary"), default="jsonl")
+    parser.add_argument("--workers", type=int, default=0, help="scramble on this many processes (0: in this one)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="words per task; part of what the seed reproduces")
+    parser.add_argument("--avoid-real-words", action="store_true", help="never use a scramble that is itself a word")
+    parser.add_argument(
+        "--difficulty-model", choices=sorted(DIFFICULTY_MODELS), help="bucket words by this model instead of length"
+    )
+    args = parser.parse_args(argv)
+
+    seed = args.seed if args.seed is not None else CounterRNG().getrandbits(32)
+    difficulties = args.difficulty or WordGameLogic.DIFFICULTIES
+    model = get_model(args.difficulty_model) if args.difficulty_model else None
+    dictionary = load_dictionary(args.word_file, model=model)
+    try:
+        puzzles = generate_puzzles(
+            dictionary, args.count, difficulties, seed, args.workers, args.chunk_size, args.avoid_real_words
+        )
+        if args.format == "binary":
+            if args.output == "-":
+                parser.error("binary packs need an output file")
+            with open(args.output, "wb") as f:
+                n = write_binary(puzzles, f, args.count * len(difficulties), difficulties)
+        elif args.output == "-":
+            n = write_jsonl(puzzles, sys.stdout)
+        else:
+            with open(args.output, "w", encoding="utf-8") as f:
+                n = write_jsonl(puzzles, f)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    print(f"Wrote {n} puzzles to {args.output} (seed {seed})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Hot reload of a word list while sessions keep playing.
+
+DictionaryWatcher polls the word file's stamp (mtime, inode, size). When it
+changes, the new version is loaded and prepared on the watcher's thread,
+compared with the current one and swapped in with replace_dictionary().
+Sessions move over lazily on their next draw, keeping the words they have
+already used; rounds in progress only hold their word, so they finish
+unaffected.
+"""
+import threading
+from typing import Callable, List, Optional, Sequence
+
+from word_scramble_logic import WordDictionary, replace_dictionary
+from word_scramble_wordlist import file_stamp
+
+
+class WordListDiff:
+    """Words added to and removed from a word list by a reload."""
+
+    __slots__ = ("added", "removed")
+
+    def __init__(self, added: List[str], removed: List[str]):
+        self.added = added
+        self.removed = removed
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed)
+
+    def __repr__(self) -> str:
+        return f"<WordListDiff +{len(self.added)} -{len(self.removed)}>"
+
+
+def diff_words(old: Sequence[str], new: Sequence[str]) -> WordListDiff:
+    old_set, new_set = set(old), set(new)
+    return WordListDiff(sorted(new_set - old_set), sorted(old_set - new_set))
+
+
+ReloadHook = Callable[[WordDictionary, WordDictionary, WordListDiff], None]
+
+
+class DictionaryWatcher:
+    """
+    Watches one WordDictionary's file and swaps in new versions.
+    - check() does one poll; start() polls every interval seconds on a
+      daemon thread until close()
+    - a version with the same set of words is not swapped in
+    - on_reload(old, new, diff) runs before the swap, on the watcher's
+      thread, so callers can prepare their own state for the new list
+    The new dictionary's signature and position lookups are built before
+    the swap, so sessions moving over never pay for them in a draw.
+    """
+
+    def __init__(
+        self,
+        dictionary: WordDictionary,
+        interval: float = 2.0,
+        on_reload: Optional[ReloadHook] = None,
+    ):
+        self.dictionary = dictionary
+        self.interval = interval
+        self.on_reload = on_reload
+        self.reloads = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def check(self) -> Optional[WordListDiff]:
+        """Reload if the file changed; returns the diff when a new version was swapped in."""
+        current = self.dictionary
+        try:
+            stamp = file_stamp(current.word_file)
+        except OSError:
+            return None  # mid-replace; look again next time
+        if stamp == current.stamp:
+            return None
+
+        new = WordDictionary(current.word_file, current.use_mmap, current.model)
+        diff = diff_words(current.words, new.words)
+        if not diff:
+            current.stamp = new.stamp
+            return None
+        # build the lookups sessions need to move over now, off their path
+        new.signatures
+        new.index.positions()
+        if self.on_reload is not None:
+            self.on_reload(current, new, diff)
+        replace_dictionary(current, new)
+        self.dictionary = new
+        self.reloads += 1
+        return diff
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except (OSError, ValueError, UnicodeDecodeError):
+                pass  # half-written or invalid file: keep the current list
+
+    def start(self) -> "DictionaryWatcher":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="word-list-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
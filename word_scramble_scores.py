@@ -0,0 +1,231 @@
+"""
+Persistent scoreboard: an append-only round log plus periodic snapshots.
+
+Layout of a store directory:
+    scores.log            one JSON record per line, each with a sequence number
+    scores.snapshot.json  per-player totals and the last sequence number folded in
+
+Writes are buffered and flushed by a background thread in groups (one
+write + fsync per batch), so recording a round never waits on the disk.
+compact() folds the log into a new snapshot; on load the snapshot is read
+and only log records newer than it are replayed.
+"""
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class PlayerStats:
+    """
+    Scoreboard totals for one player. bests maps a difficulty to that
+    difficulty's [best_attempts, best_time], for leaderboards.
+    """
+
+    __slots__ = ("total_rounds", "rounds_won", "best_attempts", "best_time", "bests")
+
+    def __init__(
+        self,
+        total_rounds: int = 0,
+        rounds_won: int = 0,
+        best_attempts: Optional[int] = None,
+        best_time: Optional[float] = None,
+        bests: Optional[Dict[str, list]] = None,
+    ):
+        self.total_rounds = total_rounds
+        self.rounds_won = rounds_won
+        self.best_attempts = best_attempts
+        self.best_time = best_time
+        self.bests: Dict[str, list] = bests or {}
+
+    def add_win(self, attempts: int, time_used_seconds: float, difficulty: Optional[str] = None) -> None:
+        self.rounds_won += 1
+        if self.best_attempts is None or attempts < self.best_attempts:
+            self.best_attempts = attempts
+        if self.best_time is None or time_used_seconds < self.best_time:
+            self.best_time = time_used_seconds
+        if difficulty is not None:
+            best = self.bests.get(difficulty)
+            if best is None:
+                self.bests[difficulty] = [attempts, time_used_seconds]
+            else:
+                best[0] = min(best[0], attempts)
+                best[1] = min(best[1], time_used_seconds)
+
+    def to_list(self) -> list:
+        return [self.total_rounds, self.rounds_won, self.best_attempts, self.best_time, self.bests]
+
+
+class ScoreStore:
+    """
+    Thread-safe scoreboard store shared by any number of sessions.
+    - record_round / record_win update memory at once and queue a log record
+    - the flusher writes queued records when batch_size are waiting or
+      flush_interval seconds have passed (group commit)
+    - after compact_every logged records the flusher writes a snapshot
+    """
+
+    LOG_NAME = "scores.log"
+    SNAPSHOT_NAME = "scores.snapshot.json"
+
+    def __init__(
+        self,
+        directory: str,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+        compact_every: int = 100_000,
+    ):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.compact_every = compact_every
+        os.makedirs(directory, exist_ok=True)
+        self.log_path = os.path.join(directory, self.LOG_NAME)
+        self.snapshot_path = os.path.join(directory, self.SNAPSHOT_NAME)
+
+        self.players: Dict[str, PlayerStats] = {}
+        self.seq = 0
+        self._buffer: List[str] = []
+        self._since_compact = 0
+        self._lock = threading.Lock()  # players, seq, buffer
+        self._io_lock = threading.Lock()  # log file and snapshot
+        self._wake = threading.Condition(self._lock)
+        self._closed = False
+
+        self.load()
+        self._log = open(self.log_path, "a", encoding="utf-8")
+        self._flusher = threading.Thread(target=self._run, name="score-flusher", daemon=True)
+        self._flusher.start()
+
+    # -------------------------
+    # Loading
+    # -------------------------
+    def load(self) -> None:
+        """Read the snapshot, then replay newer log records."""
+        snapshot_seq = 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            snapshot_seq = snapshot["seq"]
+            self.players = {name: PlayerStats(*fields) for name, fields in snapshot["players"].items()}
+        self.seq = snapshot_seq
+
+        if os.path.exists(self.log_path):
+            good = 0  # byte offset just past the last complete record
+            with open(self.log_path, "r+b") as f:
+                for line in f:
+                    # flush() ends every record with a newline, so a line
+                    # without one is a torn final write from a crash
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        record = json.loads(line)
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        break
+                    good += len(line)
+                    if record[0] > snapshot_seq:
+                        self._apply(record)
+                        self.seq = record[0]
+                        self._since_compact += 1
+                # cut the torn tail, or new records would be appended to it
+                # and lost on every later load
+                f.truncate(good)
+
+    def _apply(self, record: list) -> None:
+        _, kind, player = record[:3]
+        stats = self.players.get(player)
+        if stats is None:
+            stats = self.players[player] = PlayerStats()
+        if kind == "r":
+            stats.total_rounds += 1
+        elif kind == "w":
+            stats.add_win(record[4], record[5], record[3])
+
+    # -------------------------
+    # Recording
+    # -------------------------
+    def _append(self, record: list) -> None:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("score store is closed")
+            self.seq += 1
+            record[0] = self.seq
+            self._apply(record)
+            self._buffer.append(json.dumps(record, separators=(",", ":")))
+            if len(self._buffer) >= self.batch_size:
+                self._wake.notify()
+
+    def record_round(self, player: str, difficulty: Optional[str] = None) -> None:
+        self._append([0, "r", player, difficulty])
+
+    def record_win(self, player: str, difficulty: Optional[str], attempts: int, time_used_seconds: float) -> None:
+        self._append([0, "w", player, difficulty, attempts, time_used_seconds])
+
+    def stats(self, player: str) -> Optional[PlayerStats]:
+        with self._lock:
+            return self.players.get(player)
+
+    def all_bests(self) -> List[Tuple[str, Dict[str, list]]]:
+        """(player, {difficulty: [best_attempts, best_time]}) for every player."""
+        with self._lock:
+            return [(name, {d: list(b) for d, b in s.bests.items()}) for name, s in self.players.items()]
+
+    # -------------------------
+    # Flushing and compaction
+    # -------------------------
+    def flush(self) -> None:
+        """Write and fsync everything recorded so far."""
+        with self._io_lock:
+            with self._lock:
+                lines, self._buffer = self._buffer, []
+            if lines:
+                self._log.write("\n".join(lines) + "\n")
+                self._log.flush()
+                os.fsync(self._log.fileno())
+                self._since_compact += len(lines)
+
+    def compact(self) -> None:
+        """Fold the log into a fresh snapshot and start an empty log."""
+        with self._io_lock:
+            with self._lock:
+                # unwritten records are already applied, so the snapshot covers them
+                self._buffer = []
+                snapshot = {
+                    "seq": self.seq,
+                    "players": {name: s.to_list() for name, s in self.players.items()},
+                }
+            tmp = self.snapshot_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.snapshot_path)
+            # records up to snapshot["seq"] are now in the snapshot, so
+            # a crash before the truncate below only leaves skippable lines
+            self._log.close()
+            self._log = open(self.log_path, "w", encoding="utf-8")
+            self._since_compact = 0
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                deadline = time.monotonic() + self.flush_interval
+                while not self._closed and len(self._buffer) < self.batch_size:
+                    left = deadline - time.monotonic()
+                    if left <= 0:
+                        break
+                    self._wake.wait(left)
+                closed = self._closed
+            self.flush()
+            if self._since_compact >= self.compact_every:
+                self.compact()
+            if closed:
+                return
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._wake.notify()
+        self._flusher.join()
+        self._log.close()
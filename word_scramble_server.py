@@ -0,0 +1,479 @@
+"""
+Headless game server: line-delimited JSON over TCP or a Unix socket.
+
+Each request is one JSON object per line with a "cmd" field; each reply is
+one JSON object per line with "ok" set. Once a round's time is up, guess,
+hint and solve all reply {"result": "timeout", "word"}; next during an
+unfinished round counts it as given up. Commands:
+    start       {"cmd": "start", "player"?: str, "seed"?: int, "adaptive"?: bool, "category"?: str}
+                                                              -> {"session": id}
+    categories  {"cmd": "categories"}                         -> {"categories": [name, ...]}
+    next        {"cmd": "next", "session", "difficulty", "anagrams"?: "avoid" | "prefer"}
+                                                              -> {"scrambled", "seconds", "remaining"}
+    guess       {"cmd": "guess", "session", "guess"}          -> {"result": "correct" | "wrong" | "timeout"}
+    hint        {"cmd": "hint", "session"}                    -> {"position", "letter", "tile", "pattern"}
+    solve       {"cmd": "solve", "session"}                   -> {"word"}
+    scoreboard  {"cmd": "scoreboard", "session"}              -> scoreboard fields and "player"
+    metrics     {"cmd": "metrics", "format"?: "json" | "prometheus"}
+                                                              -> {"metrics": snapshot or text}
+    leaderboard {"cmd": "leaderboard", "difficulty", "metric"?: "time" | "attempts", "n"?: int,
+                 "session"?}                                  -> {"top": [[score, player], ...], "rank"}
+    end         {"cmd": "end", "session"}                     -> {}
+
+Run:
+    python word_scramble_server.py --port 8765
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from word_scramble_adaptive import WordStats
+from word_scramble_categories import CategoryRegistry
+from word_scramble_difficulty import DIFFICULTY_MODELS, DifficultyModel, get_model
+from word_scramble_leaderboard import Leaderboard
+from word_scramble_logic import (
+    RoundHints,
+    RoundTimer,
+    WordDictionary,
+    WordGameLogic,
+    difficulty_to_seconds,
+    load_dictionary,
+)
+from word_scramble_metrics import Metrics
+from word_scramble_reload import DictionaryWatcher, WordListDiff
+from word_scramble_scores import ScoreStore
+
+Request = Dict[str, Any]
+Response = Dict[str, Any]
+
+
+class ProtocolError(Exception):
+    """A request the server understood but cannot serve; sent back as an error reply."""
+
+
+def _field(request: Request, key: str, kind: type, default: Any = None) -> Any:
+    """request[key] if it is a kind (or missing/null: default); ProtocolError otherwise."""
+    value = request.get(key)
+    if value is None:
+        return default
+    # bool is an int subclass, but true is not a seed
+    if not isinstance(value, kind) or (isinstance(value, bool) and kind is not bool):
+        raise ProtocolError(f"{key} must be {'an' if kind is int else 'a'} {kind.__name__}")
+    return value
+
+
+def leaderboard_reply(leaderboard: Leaderboard, request: Request, player: Optional[str]) -> Response:
+    """The leaderboard command's reply, with player's rank (None without a player)."""
+    difficulty = _field(request, "difficulty", str, "Medium")
+    metric = _field(request, "metric", str, "time")
+    n = min(_field(request, "n", int, 10), 100)
+    rank = leaderboard.rank_of(player, difficulty, metric) if player is not None else None
+    return {"top": leaderboard.top(difficulty, metric, n), "rank": rank}
+
+
+class ServerSession:
+    """One remote player's game: a WordGameLogic plus the current round."""
+
+    __slots__ = ("logic", "word", "timer", "hints", "attempts", "last_seen")
+
+    def __init__(self, logic: WordGameLogic):
+        self.logic = logic
+        self.word: Optional[str] = None  # set while a round is active
+        self.timer: Optional[RoundTimer] = None
+        self.hints: Optional[RoundHints] = None
+        self.attempts = 0
+        self.last_seen = time.monotonic()
+
+    def end_round(self) -> str:
+        word, self.word, self.timer, self.hints = self.word, None, None, None
+        return word
+
+
+class GameSessions:
+    """
+    Transport-independent command dispatcher over many sessions.
+    Round deadlines are checked lazily when a guess arrives, so an idle
+    session costs no timers; sessions idle longer than idle_timeout are
+    dropped by expire_idle().
+    With adaptive set, sessions draw words weighted by one shared WordStats
+    that all of them feed; without it no per-word stats are kept (a start
+    asking for adaptive gets stats of its own). With metrics, every session
+    reports into that one Metrics. With watch_interval the word file is
+    polled and reloaded in place; call close() to stop watching.
+    With categories (a CategoryRegistry), start may name a category to play
+    instead of word_file; such sessions keep their own stats, and their
+    lists are not watched.
+    """
+
+    def __init__(
+        self,
+        word_file: str = "word_list.txt",
+        idle_timeout: float = 600.0,
+        use_mmap: bool = False,
+        score_store: Optional[ScoreStore] = None,
+        leaderboard: Optional[Leaderboard] = None,
+        difficulty_model: Optional[DifficultyModel] = None,
+        adaptive: bool = False,
+        metrics: Optional[Metrics] = None,
+        watch_interval: float = 0.0,
+        categories: Optional[CategoryRegistry] = None,
+    ):
+        self.dictionary = load_dictionary(word_file, use_mmap, difficulty_model)
+        self.word_stats = WordStats(len(self.dictionary.words)) if adaptive else None
+        self.adaptive = adaptive
+        self.categories = categories
+        self.metrics = metrics
+        self.score_store = score_store
+        self.leaderboard = leaderboard or Leaderboard()
+        if score_store is not None and leaderboard is None:
+            self.leaderboard.load(score_store)
+        self.idle_timeout = idle_timeout
+        self.watcher: Optional[DictionaryWatcher] = None
+        if watch_interval > 0:
+            self.watcher = DictionaryWatcher(self.dictionary, watch_interval, self._on_reload).start()
+        self.sessions: Dict[str, ServerSession] = {}
+        self._commands: Dict[str, Callable[[Request], Response]] = {
+            "start": self.cmd_start,
+            "categories": self.cmd_categories,
+            "next": self.cmd_next,
+            "guess": self.cmd_guess,
+            "hint": self.cmd_hint,
+            "solve": self.cmd_solve,
+            "scoreboard": self.cmd_scoreboard,
+            "metrics": self.cmd_metrics,
+            "leaderboard": self.cmd_leaderboard,
+            "end": self.cmd_end,
+        }
+
+    def handle(self, request: Request) -> Response:
+        """Run one request; never raises for bad input."""
+        try:
+            if not isinstance(request, dict):
+                raise ProtocolError("request must be a JSON object")
+            command = self._commands.get(_field(request, "cmd", str))
+            if command is None:
+                raise ProtocolError(f"unknown command: {request.get('cmd')!r}")
+            response = command(request)
+        except (ProtocolError, ValueError, RuntimeError) as e:
+            return {"ok": False, "error": str(e)}
+        response["ok"] = True
+        return response
+
+    def _on_reload(self, old: WordDictionary, new: WordDictionary, diff: WordListDiff) -> None:
+        # runs on the watcher thread before the swap; sessions follow both lazily
+        if self.word_stats is not None:
+            self.word_stats = self.word_stats.remap(old.words, len(new.words), new.word_id)
+        self.dictionary = new
+
+    def close(self) -> None:
+        if self.watcher is not None:
+            self.watcher.close()
+
+    def _session(self, request: Request) -> ServerSession:
+        session = self.sessions.get(_field(request, "session", str))
+        if session is None:
+            raise ProtocolError("unknown session")
+        session.last_seen = time.monotonic()
+        return session
+
+    @staticmethod
+    def _timed_out(session: ServerSession) -> Optional[Response]:
+        """If the round's time is up, record the loss and return the timeout reply."""
+        if session.word is None or not session.timer.expired():
+            return None
+        session.logic.record_loss("timeout")
+        return {"result": "timeout", "word": session.end_round()}
+
+    def expire_idle(self) -> int:
+        """Drop sessions idle for longer than idle_timeout; returns how many."""
+        cutoff = time.monotonic() - self.idle_timeout
+        idle = [sid for sid, s in self.sessions.items() if s.last_seen < cutoff]
+        for sid in idle:
+            del self.sessions[sid]
+        return len(idle)
+
+    # -------------------------
+    # Commands
+    # -------------------------
+    def cmd_start(self, request: Request) -> Response:
+        session_id = _field(request, "session", str) or uuid.uuid4().hex
+        if session_id in self.sessions:
+            raise ProtocolError("session already exists")
+        player = _field(request, "player", str)
+        dictionary, word_stats = self.dictionary, self.word_stats
+        category = _field(request, "category", str)
+        if category is not None:
+            if self.categories is None:
+                raise ProtocolError("categories are not enabled")
+            dictionary, word_stats = self.categories.get(category), None
+        logic = WordGameLogic(
+            dictionary=dictionary,
+            seed=_field(request, "seed", int),
+            player=player,
+            score_store=self.score_store,
+            leaderboard=self.leaderboard,
+            word_stats=word_stats,
+            adaptive=_field(request, "adaptive", bool, self.adaptive),
+            metrics=self.metrics,
+        )
+        logic.start_run(reset_scoreboard=player is None)
+        self.sessions[session_id] = ServerSession(logic)
+        return {"session": session_id}
+
+    def cmd_categories(self, request: Request) -> Response:
+        return {"categories": self.categories.names() if self.categories is not None else []}
+
+    def cmd_next(self, request: Request) -> Response:
+        session = self._session(request)
+        if self._timed_out(session) is None and session.word is not None:
+            session.logic.record_loss("revealed")  # skipped: given up
+            session.end_round()
+        difficulty = _field(request, "difficulty", str, "Medium")
+        word, scrambled, order = session.logic.next_word(difficulty, anagrams=_field(request, "anagrams", str))
+        seconds = difficulty_to_seconds(difficulty)
+        session.word = word
+        session.timer = RoundTimer(seconds)
+        session.hints = RoundHints(word, order)
+        session.attempts = 0
+        return {
+            "scrambled": scrambled,
+            "seconds": seconds,
+            "remaining": session.logic.remaining_counts(),
+        }
+
+    def cmd_guess(self, request: Request) -> Response:
+        session = self._session(request)
+        if session.word is None:
+            raise ProtocolError("no active round")
+        timed_out = self._timed_out(session)
+        if timed_out is not None:
+            return timed_out
+
+        session.attempts += 1
+        guess = _field(request, "guess", str, "")
+        if not session.logic.is_correct_guess(guess, session.word):
+            return {"result": "wrong", "attempts": session.attempts}
+
+        time_used = session.timer.elapsed()
+        session.logic.record_win(session.attempts, time_used)
+        word = session.end_round()
+        return {"result": "correct", "attempts": session.attempts, "time": time_used, "word": word}
+
+    def cmd_hint(self, request: Request) -> Response:
+        session = self._session(request)
+        if session.word is None:
+            raise ProtocolError("no active round")
+        timed_out = self._timed_out(session)
+        if timed_out is not None:
+            return timed_out
+        hint = session.hints.next_hint()
+        if hint is None:
+            raise ProtocolError("every letter is already revealed")
+        position, letter, tile = hint
+        return {"position": position, "letter": letter, "tile": tile, "pattern": session.hints.pattern()}
+
+    def cmd_solve(self, request: Request) -> Response:
+        session = self._session(request)
+        if session.word is None:
+            raise ProtocolError("no active round")
+        timed_out = self._timed_out(session)
+        if timed_out is not None:
+            return timed_out
+        session.logic.record_loss("revealed")
+        return {"word": session.end_round()}
+
+    def cmd_scoreboard(self, request: Request) -> Response:
+        logic = self._session(request).logic
+        return {
+            "player": logic.player,
+            "total_rounds": logic.total_rounds,
+            "rounds_won": logic.rounds_won,
+            "best_attempts": logic.best_attempts,
+            "best_time": logic.best_time,
+        }
+
+    def cmd_metrics(self, request: Request) -> Response:
+        if self.metrics is None:
+            raise ProtocolError("metrics are not enabled")
+        if _field(request, "format", str) == "prometheus":
+            return {"metrics": self.metrics.to_prometheus()}
+        return {"metrics": self.metrics.snapshot()}
+
+    def cmd_leaderboard(self, request: Request) -> Response:
+        player = None
+        if _field(request, "session", str) is not None:
+            player = self._session(request).logic.player
+        return leaderboard_reply(self.leaderboard, request, player)
+
+    def cmd_end(self, request: Request) -> Response:
+        self._session(request)
+        del self.sessions[request["session"]]
+        return {}
+
+
+class GameServer:
+    """
+    asyncio front end for GameSessions; all sessions share one event loop.
+    With a metrics_file, the sessions' metrics are written there in
+    Prometheus text format on every sweep and on close.
+    """
+
+    def __init__(
+        self,
+        sessions: Optional[GameSessions],
+        sweep_interval: float = 30.0,
+        metrics_file: Optional[str] = None,
+    ):
+        self.sessions = sessions
+        self.sweep_interval = sweep_interval
+        self.metrics_file = metrics_file
+        self.server: Optional[asyncio.AbstractServer] = None
+        self._sweeper: Optional[asyncio.Task] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765, unix_path: Optional[str] = None):
+        if unix_path:
+            self.server = await asyncio.start_unix_server(self.handle_client, path=unix_path)
+        else:
+            self.server = await asyncio.start_server(self.handle_client, host, port)
+        self._sweeper = asyncio.create_task(self._sweep())
+        return self.server
+
+    async def close(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.write_metrics()
+        if self.sessions is not None:
+            self.sessions.close()
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self.sessions.expire_idle()
+            self.write_metrics()
+
+    def write_metrics(self) -> None:
+        if self.metrics_file and self.sessions is not None and self.sessions.metrics is not None:
+            self.sessions.metrics.write(self.metrics_file)
+
+    async def dispatch(self, request: Request) -> Response:
+        return self.sessions.handle(request)
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError:
+                    response = {"ok": False, "error": "invalid JSON"}
+                else:
+                    response = await self.dispatch(request)
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(args: argparse.Namespace) -> None:
+    store = None
+    if args.workers:
+        # imported here: the shard module builds on this one
+        from word_scramble_shard import ShardRouter, ShardedGameServer
+
+        router = ShardRouter(
+            args.word_file,
+            workers=args.workers,
+            idle_timeout=args.idle_timeout,
+            difficulty_model=args.difficulty_model,
+            adaptive=args.adaptive,
+        )
+        server: GameServer = ShardedGameServer(router)
+    else:
+        store = ScoreStore(args.scores) if args.scores else None
+        model = get_model(args.difficulty_model) if args.difficulty_model else None
+        metrics = Metrics() if args.metrics or args.metrics_file else None
+        sessions = GameSessions(
+            args.word_file,
+            idle_timeout=args.idle_timeout,
+            score_store=store,
+            difficulty_model=model,
+            adaptive=args.adaptive,
+            metrics=metrics,
+            watch_interval=args.watch,
+            categories=CategoryRegistry(args.categories, memory_budget_mb=args.category_memory, model=model)
+            if args.categories else None,
+        )
+        server = GameServer(sessions, metrics_file=args.metrics_file)
+    srv = await server.start(args.host, args.port, args.unix)
+    print(f"Serving on {args.unix or f'{args.host}:{args.port}'}")
+    try:
+        async with srv:
+            await srv.serve_forever()
+    finally:
+        await server.close()
+        if store is not None:
+            store.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Word scramble game server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on a Unix socket path instead of TCP")
+    parser.add_argument("--word-file", default="word_list.txt")
+    parser.add_argument("--idle-timeout", type=float, default=600.0, help="seconds before idle sessions are dropped")
+    parser.add_argument("--workers", type=int, default=0, help="shard sessions over this many processes")
+    parser.add_argument("--scores", help="directory for persistent scoreboards (single-process mode)")
+    parser.add_argument(
+        "--difficulty-model", choices=sorted(DIFFICULTY_MODELS), help="bucket words by this model instead of length"
+    )
+    parser.add_argument(
+        "--adaptive", action="store_true", help="draw words weighted towards a target solve rate by default"
+    )
+    parser.add_argument(
+        "--watch", type=float, default=0.0, metavar="SECONDS",
+        help="poll the word file this often and reload it without dropping sessions (single-process mode)",
+    )
+    parser.add_argument(
+        "--categories", metavar="DIR",
+        help="offer every word list in DIR as a category, loaded on first use (single-process mode)",
+    )
+    parser.add_argument(
+        "--category-memory", type=float, default=256.0, metavar="MB",
+        help="memory budget for loaded categories; least recently used ones are dropped beyond it",
+    )
+    parser.add_argument(
+        "--metrics", action="store_true", help="collect metrics (read with the metrics command; single-process mode)"
+    )
+    parser.add_argument("--metrics-file", help="also write metrics here in Prometheus text format (single-process mode)")
+    args = parser.parse_args(argv)
+    if args.workers:
+        single = [
+            flag for flag, value in (
+                ("--scores", args.scores),
+                ("--watch", args.watch),
+                ("--categories", args.categories),
+                ("--metrics", args.metrics),
+                ("--metrics-file", args.metrics_file),
+            ) if value
+        ]
+        if single:
+            parser.error(f"{', '.join(single)} only work in single-process mode, not with --workers")
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
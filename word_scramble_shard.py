@@ -0,0 +1,192 @@
+"""
+Spread game sessions over a pool of worker processes.
+
+The word list is compiled once (see word_scramble_wordlist) and every
+worker memory-maps the same compiled file, so the dictionary lives once in
+the OS page cache instead of once per process. Sessions are pinned to a
+worker by hashing their id, so a session's draw state never leaves its
+worker. The leaderboard stays in the router: workers pass the wins of each
+request back with its reply, and the router answers leaderboard requests
+itself, so rankings cover every player. Categories, metrics, persistent
+scores and word file watching are single-process features: the router
+answers the session-less categories and metrics commands itself (no
+categories, metrics not enabled).
+
+With a difficulty model the scores are computed while compiling and stored
+in the compiled file, so workers load them instead of scoring again.
+"""
+import asyncio
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Connection
+from typing import List, Optional, Tuple
+
+from word_scramble_difficulty import get_model
+from word_scramble_leaderboard import Leaderboard
+from word_scramble_server import (
+    GameServer,
+    GameSessions,
+    ProtocolError,
+    Request,
+    Response,
+    leaderboard_reply,
+)
+from word_scramble_wordlist import compile_word_list, is_compiled, resolve_path
+
+
+Win = Tuple[str, str, int, float]  # Leaderboard.record_win arguments
+
+
+class _WinRelay(Leaderboard):
+    """A worker's leaderboard: wins are only queued, for the router's leaderboard."""
+
+    def __init__(self):
+        super().__init__()
+        self.wins: List[Win] = []
+
+    def record_win(self, player: str, difficulty: str, attempts: int, time_used_seconds: float) -> None:
+        self.wins.append((player, difficulty, attempts, time_used_seconds))
+
+
+def _worker_main(
+    word_file: str, conn: Connection, idle_timeout: float, sweep_interval: float, adaptive: bool
+) -> None:
+    relay = _WinRelay()
+    sessions = GameSessions(
+        word_file, idle_timeout=idle_timeout, use_mmap=True, leaderboard=relay, adaptive=adaptive
+    )
+    while True:
+        if not conn.poll(sweep_interval):
+            sessions.expire_idle()
+            continue
+        request = conn.recv()
+        if request is None:
+            return
+        response = sessions.handle(request)
+        conn.send((response, relay.wins))
+        relay.wins = []
+
+
+class ShardRouter:
+    """
+    Owns the worker processes and routes each request to its session's worker.
+    call() is thread-safe; calls to different workers run in parallel.
+    leaderboard holds every worker's wins.
+    """
+
+    def __init__(
+        self,
+        word_file: str = "word_list.txt",
+        workers: Optional[int] = None,
+        idle_timeout: float = 600.0,
+        sweep_interval: float = 30.0,
+        difficulty_model: Optional[str] = None,
+        adaptive: bool = False,
+    ):
+        self._tmpdir: Optional[str] = None
+        # an already compiled list is used as-is, with the scores it was compiled with
+        if is_compiled(word_file):
+            shared_file = resolve_path(word_file)
+        else:
+            self._tmpdir = tempfile.mkdtemp(prefix="word-scramble-")
+            shared_file = os.path.join(self._tmpdir, "words.wsc")
+            with open(resolve_path(word_file), "r", encoding="utf-8") as f:
+                model = get_model(difficulty_model) if difficulty_model else None
+                compile_word_list(f, shared_file, model)
+
+        self.leaderboard = Leaderboard()
+        self.conns: List[Connection] = []
+        self.locks: List[threading.Lock] = []
+        self.processes: List[multiprocessing.Process] = []
+        for _ in range(workers or os.cpu_count() or 1):
+            parent, child = multiprocessing.Pipe()
+            proc = multiprocessing.Process(
+                target=_worker_main,
+                args=(shared_file, child, idle_timeout, sweep_interval, adaptive),
+                daemon=True,
+            )
+            proc.start()
+            child.close()
+            self.conns.append(parent)
+            self.locks.append(threading.Lock())
+            self.processes.append(proc)
+
+    def worker_for(self, session_id: str) -> int:
+        return zlib.crc32(session_id.encode("utf-8")) % len(self.conns)
+
+    def call(self, request: Request) -> Response:
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "request must be a JSON object"}
+        if request.get("cmd") == "leaderboard":
+            return self._leaderboard(request)
+        if request.get("cmd") == "categories":
+            return {"categories": [], "ok": True}
+        if request.get("cmd") == "metrics":
+            return {"ok": False, "error": "metrics are not enabled"}
+        if request.get("cmd") == "start" and not request.get("session"):
+            # pick the id here so the session can be routed
+            request = dict(request, session=uuid.uuid4().hex)
+        session_id = request.get("session")
+        if not isinstance(session_id, str):
+            return {"ok": False, "error": "unknown session"}
+
+        worker = self.worker_for(session_id)
+        with self.locks[worker]:
+            self.conns[worker].send(request)
+            response, wins = self.conns[worker].recv()
+        for win in wins:
+            self.leaderboard.record_win(*win)
+        return response
+
+    def _leaderboard(self, request: Request) -> Response:
+        player = None
+        if request.get("session") is not None:
+            # the session's worker knows its player
+            scoreboard = self.call({"cmd": "scoreboard", "session": request["session"]})
+            if not scoreboard["ok"]:
+                return scoreboard
+            player = scoreboard["player"]
+        try:
+            response = leaderboard_reply(self.leaderboard, request, player)
+        except (ProtocolError, ValueError) as e:
+            return {"ok": False, "error": str(e)}
+        response["ok"] = True
+        return response
+
+    def close(self) -> None:
+        for conn, lock in zip(self.conns, self.locks):
+            with lock:
+                conn.send(None)
+                conn.close()
+        for proc in self.processes:
+            proc.join()
+        if self._tmpdir is not None:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+
+class ShardedGameServer(GameServer):
+    """GameServer that forwards requests to a ShardRouter instead of running them."""
+
+    def __init__(self, router: ShardRouter):
+        super().__init__(sessions=None)
+        self.router = router
+        self.executor = ThreadPoolExecutor(max_workers=2 * len(router.conns))
+
+    async def dispatch(self, request: Request) -> Response:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.router.call, request)
+
+    async def _sweep(self) -> None:
+        # workers expire their own idle sessions
+        return
+
+    async def close(self) -> None:
+        await super().close()
+        self.executor.shutdown()
+        self.router.close()
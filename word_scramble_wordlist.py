@@ -0,0 +1,364 @@
+import argparse
+import hashlib
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import zlib
+from array import array
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union, overload
+
+try:
+    import numpy as np
+except ImportError:  # optional: only speeds up scanning memory-mapped lists
+    np = None
+
+from word_scramble_difficulty import DIFFICULTY_MODELS, DifficultyModel, has_default_settings
+
+# One word per line: group 1 is the line with surrounding whitespace stripped.
+# Blank lines do not match, mirroring load_words_from_file.
+_WORD_LINE = re.compile(rb"^[ \t\r\f\v]*(\S(?:[^\n]*\S)?)[ \t\r\f\v]*$", re.MULTILINE)
+_NON_ASCII = re.compile(rb"[\x80-\xff]")
+_SPACE_BYTES = b" \t\r\f\v"
+
+# Compiled word list layout (all numbers little-endian):
+#   header        magic, version, flags, word_count, data_size, max_len, crc32
+#   length table  (max_len + 2) x u64: words of length L are [table[L], table[L + 1])
+#   offsets       (word_count + 1) x u64 byte offsets into data
+#   data          packed uppercase UTF-8 words, sorted by length
+#   scores        only with FLAG_SCORES (version 2): difficulty model name
+#                 (16 bytes, NUL-padded), word_count x u32 word ids sorted by
+#                 score, then word_count x f32 scores in that same order
+# crc32 covers everything after the header. Version 1 files have no flags.
+COMPILED_MAGIC = b"WSCW"
+COMPILED_VERSION = 2
+FLAG_SCORES = 1
+_HEADER = struct.Struct("<4sHHQQII")
+_MODEL_NAME = struct.Struct("<16s")
+
+
+def resolve_path(file_name: str) -> str:
+    """
+    Resolve a word file name relative to this module's folder.
+    Absolute paths are returned unchanged.
+    """
+    base = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base, file_name)
+
+
+def file_stamp(file_name: str) -> Tuple[int, int, int]:
+    """(mtime_ns, inode, size) of a file: changes when the file is edited or replaced."""
+    st = os.stat(resolve_path(file_name))
+    return st.st_mtime_ns, st.st_ino, st.st_size
+
+
+def _le_array(buf: memoryview, typecode: str = "Q") -> array:
+    table = array(typecode)
+    table.frombytes(buf)
+    if sys.byteorder != "little":
+        table.byteswap()
+    return table
+
+
+def _le_bytes(values: Iterable[int], typecode: str = "Q") -> bytes:
+    table = array(typecode, values)
+    if sys.byteorder != "little":
+        table.byteswap()
+    return table.tobytes()
+
+
+def is_compiled(file_name: str) -> bool:
+    with open(resolve_path(file_name), "rb") as f:
+        return f.read(len(COMPILED_MAGIC)) == COMPILED_MAGIC
+
+
+def compile_word_list(words: Iterable[str], out_file: str, model: Optional[DifficultyModel] = None) -> int:
+    """
+    Write words (uppercased, de-duplicated, stable-sorted by length) to a
+    compiled word list. Returns the number of words written.
+    With a difficulty model the words are scored now and the scores stored,
+    so loading the list does not recompute them. Only the model's name is
+    stored, so it must have default settings (ValueError otherwise); lists
+    loaded with other settings are scored again.
+    """
+    if model is not None and not has_default_settings(model):
+        raise ValueError(f"Only default {model.name!r} model settings can be compiled into a word list")
+    seen = set()
+    packed: List[bytes] = []
+    for w in words:
+        b = w.strip().upper().encode("utf-8")
+        if b and b not in seen:
+            seen.add(b)
+            packed.append(b)
+    del seen
+
+    lengths = [len(b.decode("utf-8")) for b in packed]
+    order = sorted(range(len(packed)), key=lengths.__getitem__)
+    max_len = max(lengths, default=0)
+
+    length_table = [0] * (max_len + 2)
+    for length in lengths:
+        length_table[length + 1] += 1
+    for length in range(1, len(length_table)):
+        length_table[length] += length_table[length - 1]
+
+    offsets = [0]
+    for i in order:
+        offsets.append(offsets[-1] + len(packed[i]))
+
+    parts = [
+        _le_bytes(length_table),
+        _le_bytes(offsets),
+        b"".join(packed[i] for i in order),
+    ]
+    flags = 0
+    if model is not None:
+        scores = model.score_words([packed[i].decode("utf-8") for i in order])
+        by_score = sorted(range(len(packed)), key=scores.__getitem__)
+        parts.append(_MODEL_NAME.pack(model.name.encode("ascii")))
+        parts.append(_le_bytes(by_score, "I"))
+        parts.append(_le_bytes((scores[i] for i in by_score), "f"))
+        flags |= FLAG_SCORES
+    body = b"".join(parts)
+    header = _HEADER.pack(
+        COMPILED_MAGIC, COMPILED_VERSION, flags,
+        len(packed), offsets[-1], max_len, zlib.crc32(body),
+    )
+    with open(resolve_path(out_file), "wb") as f:
+        f.write(header)
+        f.write(body)
+    return len(packed)
+
+
+class CompiledWordList(Sequence[str]):
+    """
+    Word list loaded from a file written by compile_word_list.
+    The whole file is read in one go (or mapped with use_mmap=True); words
+    stay packed as bytes and are decoded on access. Words are already sorted
+    by length, so length_starts is all WordIndex needs.
+    Lists compiled with a difficulty model also carry score_model (its name),
+    score_order (word ids sorted by score) and scores (ascending, parallel
+    to score_order); otherwise these are None.
+    """
+
+    def __init__(self, file_name: str, use_mmap: bool = False):
+        self.path = resolve_path(file_name)
+        with open(self.path, "rb") as f:
+            if use_mmap:
+                self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._buf = f.read()
+        view = memoryview(self._buf)
+
+        if len(view) < _HEADER.size:
+            raise ValueError(f"{self.path}: truncated compiled word list")
+        magic, version, flags, count, data_size, max_len, crc = _HEADER.unpack_from(view)
+        if magic != COMPILED_MAGIC:
+            raise ValueError(f"{self.path}: not a compiled word list")
+        if version not in (1, COMPILED_VERSION):
+            raise ValueError(f"{self.path}: unsupported compiled word list version {version}")
+        if version == 1:
+            flags = 0
+
+        table_end = _HEADER.size + 8 * (max_len + 2)
+        offsets_end = table_end + 8 * (count + 1)
+        data_end = offsets_end + data_size
+        scores_size = _MODEL_NAME.size + 8 * count if flags & FLAG_SCORES else 0
+        if len(view) != data_end + scores_size:
+            raise ValueError(f"{self.path}: truncated compiled word list")
+        if zlib.crc32(view[_HEADER.size:]) != crc:
+            raise ValueError(f"{self.path}: checksum mismatch")
+
+        self.length_starts = list(_le_array(view[_HEADER.size:table_end]))
+        self.offsets = _le_array(view[table_end:offsets_end])
+        self._data_start = offsets_end
+
+        self.score_model: Optional[str] = None
+        self.score_order: Optional[array] = None
+        self.scores: Optional[array] = None
+        if flags & FLAG_SCORES:
+            (name,) = _MODEL_NAME.unpack_from(view, data_end)
+            order_start = data_end + _MODEL_NAME.size
+            self.score_model = name.rstrip(b"\0").decode("ascii")
+            self.score_order = _le_array(view[order_start:order_start + 4 * count], "I")
+            self.scores = _le_array(view[order_start + 4 * count:], "f")
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @overload
+    def __getitem__(self, i: int) -> str: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> List[str]: ...
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        base = self._data_start
+        return self._buf[base + self.offsets[i]:base + self.offsets[i + 1]].decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+class BloomFilter:
+    """
+    Fixed-size probabilistic set of strings: no false negatives, about
+    error_rate false positives, and capacity * ~1.2 bytes at 1% whatever
+    the word lengths. Bit positions come from the two 32-bit halves of a
+    64-bit BLAKE2b digest of the UTF-8 word (double hashing). Unlike the
+    built-in str hash it is not salted per process, so false positives,
+    and with them seeded scrambles, are the same in every run.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> List[int]:
+        h = int.from_bytes(hashlib.blake2b(item.encode("utf-8"), digest_size=8).digest(), "little")
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hashes)]
+
+    def add(self, item: str) -> None:
+        bits = self.bits
+        for pos in self._positions(item):
+            bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: object) -> bool:
+        if not isinstance(item, str):
+            return False
+        bits = self.bits
+        for pos in self._positions(item):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+
+def _scan_lines(data: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Start and end of every non-blank line of data with surrounding
+    whitespace stripped, as _WORD_LINE finds them. Works per line, not per
+    byte: only lines that still start or end with a space are looked at
+    again, which is one or two passes for real files (e.g. CRLF endings).
+    """
+    newlines = np.flatnonzero(data == ord("\n"))
+    starts = np.concatenate(([0], newlines + 1))
+    ends = np.concatenate((newlines, [len(data)]))
+    space = np.zeros(256, dtype=bool)
+    space[list(_SPACE_BYTES)] = True
+    while True:
+        grow = np.flatnonzero((starts < ends) & space[data[np.minimum(starts, len(data) - 1)]])
+        if not len(grow):
+            break
+        starts[grow] += 1
+    while True:
+        shrink = np.flatnonzero((starts < ends) & space[data[ends - 1]])
+        if not len(shrink):
+            break
+        ends[shrink] -= 1
+    keep = starts < ends
+    return starts[keep], ends[keep]
+
+
+class MappedWordList(Sequence[str]):
+    """
+    Read-only word list backed by a memory-mapped text file.
+    - the file is scanned once to build an offset table (start/end per word);
+      with NumPy installed the scan is vectorized, otherwise it is a regex
+      pass that still creates a match object per line
+    - words are decoded and uppercased on access, never held as str objects
+    - pages come from the OS page cache, so processes mapping the same file
+      share one copy of the data
+    """
+
+    def __init__(self, file_name: str):
+        self.path = resolve_path(file_name)
+        self.starts = array("Q")
+        self.ends = array("Q")
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # mmap refuses empty files
+                self._mm = None
+                self.ascii = True
+                return
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if np is not None:
+            starts, ends = _scan_lines(np.frombuffer(self._mm, dtype=np.uint8))
+            self.starts.frombytes(starts.astype(np.uint64).tobytes())
+            self.ends.frombytes(ends.astype(np.uint64).tobytes())
+        else:
+            starts_append = self.starts.append
+            ends_append = self.ends.append
+            for m in _WORD_LINE.finditer(self._mm):
+                start, end = m.span(1)
+                starts_append(start)
+                ends_append(end)
+        self.ascii = _NON_ASCII.search(self._mm) is None
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @overload
+    def __getitem__(self, i: int) -> str: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> List[str]: ...
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return self._mm[self.starts[i]:self.ends[i]].decode("utf-8").upper()
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def lengths(self) -> Sequence[int]:
+        """
+        Character length of every word, without decoding when the file is
+        ASCII (then a NumPy array if NumPy is installed).
+        """
+        if self.ascii:
+            if np is not None:
+                return np.frombuffer(self.ends, dtype=np.uint64) - np.frombuffer(self.starts, dtype=np.uint64)
+            return [e - s for s, e in zip(self.starts, self.ends)]
+        return [len(w) for w in self]
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Word list tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    comp = sub.add_parser("compile", help="compile a text word list to the binary format")
+    comp.add_argument("source", help="text word list, one word per line")
+    comp.add_argument("output", help="compiled word list to write")
+    comp.add_argument(
+        "--difficulty-model", choices=sorted(DIFFICULTY_MODELS),
+        help="score the words with this model and store the scores",
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "compile":
+        model = DIFFICULTY_MODELS[args.difficulty_model]() if args.difficulty_model else None
+        with open(resolve_path(args.source), "r", encoding="utf-8") as f:
+            count = compile_word_list(f, args.output, model)
+        print(f"Compiled {count} words to {args.output}")
+
+
+if __name__ == "__main__":
+    main()